@@ -33,6 +33,10 @@ Scoring criteria:
 
 Be strict. Only award 8+ if the document genuinely meets high quality standards."""
 
+# Compiled once at import; VERDICT is deliberately not parsed (see below).
+_SCORE_RE = re.compile(r"SCORE:\s*(\d+(?:\.\d+)?)")
+_FEEDBACK_RE = re.compile(r"FEEDBACK:\s*(.*)", re.DOTALL)
+
 
 def _parse_critic_response(content: str) -> tuple[float, str]:
     """
@@ -47,8 +51,8 @@ def _parse_critic_response(content: str) -> tuple[float, str]:
         score: float clamped to 0–10, defaults to 0.0 on parse failure.
         feedback: FEEDBACK block text, or full content on parse failure.
     """
-    score_match = re.search(r"SCORE:\s*(\d+(?:\.\d+)?)", content)
-    feedback_match = re.search(r"FEEDBACK:\s*(.*)", content, re.DOTALL)
+    score_match = _SCORE_RE.search(content)
+    feedback_match = _FEEDBACK_RE.search(content)
 
     score = float(score_match.group(1)) if score_match else 0.0
     feedback = feedback_match.group(1).strip() if feedback_match else content.strip()
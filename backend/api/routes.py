@@ -259,11 +259,15 @@ async def get_run_state(run_id: str):
 
 
 @router.post("/councils/upload-pdf", response_model=PdfUploadResponse)
-async def upload_pdf(file: UploadFile = File(...)):
+async def upload_pdf(file: UploadFile = File(...), replace: bool = False):
     """
     Upload and ingest a PDF file into the ChromaDB vector store.
 
-    The content becomes searchable by agents with the PDF Reader tool enabled.
+    The content becomes searchable by agents with the PDF Reader tool enabled,
+    with the uploaded file name as its source. By default an upload only adds
+    chunks. With ``?replace=true`` it replaces the document previously
+    uploaded under the same file name: that document's chunks which this
+    upload does not contain are deleted.
     """
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
@@ -277,14 +281,17 @@ async def upload_pdf(file: UploadFile = File(...)):
         tmp_path = tmp.name
 
     try:
-        chunks = ingest_pdf(tmp_path)
+        chunks = ingest_pdf(tmp_path, source=file.filename, replace=replace)
     finally:
         os.unlink(tmp_path)
 
+    message = f"Successfully ingested {chunks} chunks from '{file.filename}'."
+    if replace:
+        message += f" Earlier chunks stored under '{file.filename}' were replaced."
     return PdfUploadResponse(
         filename=file.filename,
         chunks_ingested=chunks,
-        message=f"Successfully ingested {chunks} chunks from '{file.filename}'.",
+        message=message,
     )
 
 
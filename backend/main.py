@@ -31,6 +31,7 @@ from api.blueprint_routes import blueprint_router
 from api.run_history_routes import run_history_router
 from api.websocket import ws_router
 from database import init_db, close_db
+from tools.pdf_reader import start_warm_preload
 
 
 @asynccontextmanager
@@ -39,6 +40,7 @@ async def lifespan(app: FastAPI):
     print("CouncilOS API starting up...")
     await init_db()
     print("Database initialized.")
+    start_warm_preload()
     yield
     await close_db()
     print("CouncilOS API shutting down...")
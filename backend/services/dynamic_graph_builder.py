@@ -10,22 +10,86 @@ Phase 4 additions:
 - Tool binding: agents with tools enabled (webSearch, pdfReader) get
   LangChain tools bound to their LLM via .bind_tools().
 - God Mode: supports interrupt_before for human-in-the-loop approval.
+- Parallel critics: consecutive critic-like nodes are collapsed into a
+  single node that runs all critics concurrently and averages their scores.
 """
 
 import asyncio
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, Optional
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph
+from pydantic import BaseModel, ConfigDict, field_validator
 
+from agents.critic_agent import _parse_critic_response
 from state import CouncilState, APPROVAL_THRESHOLD, MAX_ITERATIONS
 from tools.web_search import create_web_search_tool
 from tools.pdf_reader import create_pdf_search_tool
 
 
+# ---------------------------------------------------------------------------
+# Blueprint parsing — validated once, then read through typed fields
+# ---------------------------------------------------------------------------
+
+_DEFAULT_MODEL = "claude-3-5-sonnet"
+
+
+def _id_to_str(value: Any) -> Any:
+    """Stored blueprints may use numeric ids; the graph keys nodes by str."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+class _NodeSpec(BaseModel):
+    """A blueprint node as consumed by the graph builder."""
+
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    label: Optional[str] = None
+    systemPrompt: Optional[str] = None
+    model: Optional[str] = _DEFAULT_MODEL
+    tools: Optional[dict] = None
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def coerce_id(cls, value: Any) -> Any:
+        return _id_to_str(value)
+
+
+class _EdgeSpec(BaseModel):
+    """A blueprint edge as consumed by the graph builder."""
+
+    model_config = ConfigDict(frozen=True)
+
+    id: Optional[str] = None
+    source: str
+    target: str
+    type: str = "linear"
+    condition: Optional[str] = None
+
+    @field_validator("id", "source", "target", mode="before")
+    @classmethod
+    def coerce_ids(cls, value: Any) -> Any:
+        return _id_to_str(value)
+
+
+class _BlueprintSpec(BaseModel):
+    """The parts of a CouncilBlueprint JSON needed to build a graph."""
+
+    model_config = ConfigDict(frozen=True)
+
+    nodes: List[_NodeSpec] = []
+    edges: List[_EdgeSpec] = []
+
+
 # ---------------------------------------------------------------------------
 # LLM factory — maps model names from the frontend to LangChain chat models
 # ---------------------------------------------------------------------------
@@ -113,21 +177,29 @@ def _invoke_with_tools(llm: Any, messages: list, tools: list) -> Any:
     from langchain_core.messages import ToolMessage
 
     tool_map = {t.name: t for t in tools}
-    tool_messages = [response]
 
-    for tc in response.tool_calls:
+    def run_tool_call(tc: dict) -> Any:
         tool_fn = tool_map.get(tc["name"])
-        if tool_fn:
-            try:
-                result = tool_fn.invoke(tc["args"])
-            except Exception as exc:  # noqa: BLE001
-                result = f"[Tool Error] {exc}"
-        else:
-            result = f"[Tool Error] Unknown tool: {tc['name']}"
-
-        tool_messages.append(
-            ToolMessage(content=str(result), tool_call_id=tc["id"])
-        )
+        if not tool_fn:
+            return f"[Tool Error] Unknown tool: {tc['name']}"
+        try:
+            return tool_fn.invoke(tc["args"])
+        except Exception as exc:  # noqa: BLE001
+            return f"[Tool Error] {exc}"
+
+    # Tool calls are network-bound (web search, vector store), so several
+    # calls from one response are overlapped on threads; results keep the
+    # order of the tool calls.
+    if len(response.tool_calls) > 1:
+        with ThreadPoolExecutor(max_workers=len(response.tool_calls)) as pool:
+            results = list(pool.map(run_tool_call, response.tool_calls))
+    else:
+        results = [run_tool_call(tc) for tc in response.tool_calls]
+
+    tool_messages = [response] + [
+        ToolMessage(content=str(result), tool_call_id=tc["id"])
+        for tc, result in zip(response.tool_calls, results)
+    ]
 
     # Final LLM call with tool results
     return llm_with_tools.invoke(messages + tool_messages)
@@ -137,6 +209,26 @@ def _invoke_with_tools(llm: Any, messages: list, tools: list) -> Any:
 # Generic agent node factory
 # ---------------------------------------------------------------------------
 
+# User-prompt templates, filled from the CouncilState via str.format_map
+_FIRST_DRAFT_TEMPLATE = "Please work on the following topic:\n\n{input_topic}"
+
+_REWORK_TEMPLATE = (
+    "Topic: {input_topic}\n\n"
+    "Current draft:\n{current_draft}\n\n"
+    "Feedback ({rounds} round(s)):\n\n"
+    "{feedback_block}\n\n"
+    "Please produce an improved version."
+)
+
+_REVIEW_TEMPLATE = (
+    "Topic: {input_topic}\n\n"
+    "Current draft:\n{current_draft}\n\n"
+    "Please review and improve this draft."
+)
+
+_FEEDBACK_ROUND_TEMPLATE = "Feedback round {}:\n{}"
+
+
 def _make_agent_node(
     node_id: str,
     label: str,
@@ -166,28 +258,21 @@ def _make_agent_node(
         llm = _get_llm(model_name)
 
         # Build user prompt from current state
+        feedback_history = state["feedback_history"]
         if not state["current_draft"]:
-            user_content = (
-                f"Please work on the following topic:\n\n{state['input_topic']}"
-            )
-        elif state["feedback_history"]:
-            feedback_block = "\n\n---\n".join(
-                f"Feedback round {i + 1}:\n{fb}"
-                for i, fb in enumerate(state["feedback_history"])
-            )
-            user_content = (
-                f"Topic: {state['input_topic']}\n\n"
-                f"Current draft:\n{state['current_draft']}\n\n"
-                f"Feedback ({len(state['feedback_history'])} round(s)):\n\n"
-                f"{feedback_block}\n\n"
-                f"Please produce an improved version."
-            )
+            user_content = _FIRST_DRAFT_TEMPLATE.format_map(state)
+        elif feedback_history:
+            user_content = _REWORK_TEMPLATE.format_map({
+                "input_topic": state["input_topic"],
+                "current_draft": state["current_draft"],
+                "rounds": len(feedback_history),
+                "feedback_block": "\n\n---\n".join(
+                    _FEEDBACK_ROUND_TEMPLATE.format(i, fb)
+                    for i, fb in enumerate(feedback_history, 1)
+                ),
+            })
         else:
-            user_content = (
-                f"Topic: {state['input_topic']}\n\n"
-                f"Current draft:\n{state['current_draft']}\n\n"
-                f"Please review and improve this draft."
-            )
+            user_content = _REVIEW_TEMPLATE.format_map(state)
 
         system_msg = SystemMessage(content=system_prompt)
         user_msg = HumanMessage(content=user_content)
@@ -271,8 +356,6 @@ def _make_critic_node(
     This node evaluates the current draft and sets route_decision
     to "approve" or "rework" based on the score.
     """
-    import re
-
     node_tools = _resolve_tools(tools_config)
 
     critic_system = (
@@ -310,13 +393,8 @@ def _make_critic_node(
 
         response = _invoke_with_tools(llm, [system_msg, user_msg], node_tools)
 
-        # Parse structured response
-        score_match = re.search(r"SCORE:\s*(\d+(?:\.\d+)?)", response.content)
-        feedback_match = re.search(r"FEEDBACK:\s*(.*)", response.content, re.DOTALL)
-
-        score = float(score_match.group(1)) if score_match else 0.0
-        score = max(0.0, min(10.0, score))
-        feedback = feedback_match.group(1).strip() if feedback_match else response.content.strip()
+        # Parse structured response (same format as the fixed-pipeline critic)
+        score, feedback = _parse_critic_response(response.content)
 
         route_decision = "approve" if score >= APPROVAL_THRESHOLD else "rework"
 
@@ -337,88 +415,201 @@ def _make_critic_node(
 
 
 # ---------------------------------------------------------------------------
-# Main: build graph from blueprint JSON
+# Parallel critics — ensemble of judges
 # ---------------------------------------------------------------------------
 
-def build_graph_from_blueprint(
-    blueprint: dict,
-    god_mode: bool = False,
-) -> Any:
+def _find_critic_chains(
+    critic_ids: List[str],
+    edges: List[_EdgeSpec],
+) -> List[List[str]]:
     """
-    Dynamically construct a compiled LangGraph from a CouncilBlueprint JSON.
+    Find runs of two or more critic-like nodes joined by plain linear edges.
+
+    A critic is chained to the next one only if its single outgoing edge is
+    linear and points to a critic that has no other incoming edges, so
+    collapsing the run into one node cannot change the graph's routing.
 
     Args:
-        blueprint: A dict matching the CouncilBlueprint schema:
-            {
-                "version": 1,
-                "name": "...",
-                "nodes": [{"id", "label", "systemPrompt", "model", "tools", "position"}],
-                "edges": [{"id", "source", "target", "type", "condition?"}]
-            }
-        god_mode: If True, compile with interrupt_before on all nodes so the
-                  user can approve/reject at each step (Human-in-the-Loop).
+        critic_ids: IDs of critic-like nodes, in blueprint order.
+        edges:      The blueprint edges.
 
     Returns:
-        A compiled LangGraph StateGraph ready for invocation.
+        A list of chains, each a list of node IDs in execution order.
+    """
+    critic_set = set(critic_ids)
+    outgoing: Dict[str, List[_EdgeSpec]] = {}
+    incoming_count: Dict[str, int] = {}
+    for edge in edges:
+        outgoing.setdefault(edge.source, []).append(edge)
+        incoming_count[edge.target] = incoming_count.get(edge.target, 0) + 1
+
+    def next_critic(node_id: str) -> Optional[str]:
+        out = outgoing.get(node_id, [])
+        if len(out) != 1 or out[0].type == "conditional":
+            return None
+        target = out[0].target
+        if target in critic_set and target != node_id and incoming_count[target] == 1:
+            return target
+        return None
+
+    chained = {next_critic(cid) for cid in critic_ids} - {None}
+
+    chains = []
+    for head in critic_ids:
+        if head in chained:
+            continue
+        chain = [head]
+        nxt = next_critic(head)
+        while nxt is not None and nxt not in chain:
+            chain.append(nxt)
+            nxt = next_critic(nxt)
+        if len(chain) > 1:
+            chains.append(chain)
+    return chains
+
+
+def _make_parallel_critics_node(
+    node_id: str,
+    critics: List[tuple],
+) -> Callable[[CouncilState], dict]:
+    """
+    Create a node that runs several critic nodes concurrently and merges them.
+
+    The aggregated score is the mean of the individual scores, and the route
+    is derived from it against APPROVAL_THRESHOLD exactly like a single
+    critic. Every critic's feedback, dissenting ones included, is labelled
+    with the critic and combined into one feedback_history entry per round.
+
+    Args:
+        node_id: The node ID the aggregated critics are registered under.
+        critics: (label, critic node function) pairs, the functions built
+                 by _make_critic_node().
+
+    Returns:
+        A callable (CouncilState) -> dict suitable for StateGraph.add_node().
+    """
+
+    def parallel_critics_node(state: CouncilState) -> dict:
+        # The graph is invoked synchronously, so the LLM calls are overlapped
+        # on threads rather than with asyncio.gather.
+        with ThreadPoolExecutor(max_workers=len(critics)) as pool:
+            results = list(pool.map(lambda critic: critic[1](state), critics))
+
+        score = sum(r["critic_score"] for r in results) / len(results)
+        route_decision = "approve" if score >= APPROVAL_THRESHOLD else "rework"
+
+        result: dict = {
+            "critic_score": score,
+            "route_decision": route_decision,
+            "messages": [m for r in results for m in r["messages"]],
+            "active_node": node_id,
+        }
+
+        feedback = [
+            f"[{label}]\n{fb}"
+            for (label, _), r in zip(critics, results)
+            for fb in r.get("feedback_history", [])
+        ]
+        if feedback:
+            result["feedback_history"] = ["\n\n".join(feedback)]
+
+        return result
+
+    parallel_critics_node.__name__ = f"critics_{node_id}"
+    return parallel_critics_node
+
+
+# ---------------------------------------------------------------------------
+# Main: build graph from blueprint JSON
+# ---------------------------------------------------------------------------
+
+def _assemble_graph(blueprint: dict) -> tuple:
+    """
+    Build the uncompiled StateGraph for a CouncilBlueprint JSON.
+
+    Shared by the auto-pilot and god mode builders, which differ only in
+    how the graph is compiled.
+
+    Returns:
+        (graph, node_ids) — the StateGraph and the IDs of all registered nodes.
 
     Raises:
-        ValueError: If the blueprint is invalid (no nodes, no entry point, etc.)
+        ValueError: If the blueprint is malformed or has no nodes.
     """
-    nodes = blueprint.get("nodes", [])
-    edges = blueprint.get("edges", [])
+    spec = _BlueprintSpec.model_validate(blueprint)
+    nodes = spec.nodes
+    edges = spec.edges
 
     if not nodes:
         raise ValueError("Blueprint has no nodes.")
 
+    # Create node functions, remembering which ones are critics
+    node_fns: Dict[str, Callable[[CouncilState], dict]] = {}
+    critic_ids: List[str] = []
+    labels: Dict[str, str] = {}
+    for node in nodes:
+        nid = node.id
+        label = node.label if node.label is not None else nid
+        labels[nid] = label
+        system_prompt = (
+            node.systemPrompt if node.systemPrompt is not None else f"You are {label}."
+        )
+        model_name = node.model if node.model is not None else _DEFAULT_MODEL
+
+        if _is_critic_like(system_prompt):
+            critic_ids.append(nid)
+            node_fns[nid] = _make_critic_node(
+                nid, label, system_prompt, model_name, node.tools
+            )
+        else:
+            node_fns[nid] = _make_agent_node(
+                nid, label, system_prompt, model_name, node.tools
+            )
+
+    # Collapse consecutive critics into one parallel node registered under
+    # the chain head; the tail's outgoing edges now leave from the head.
+    for chain in _find_critic_chains(critic_ids, edges):
+        head, members = chain[0], set(chain[1:])
+        critics = [(labels[cid], node_fns[cid]) for cid in chain]
+        for cid in members:
+            del node_fns[cid]
+        node_fns[head] = _make_parallel_critics_node(head, critics)
+        edges = [
+            e.model_copy(update={"source": head}) if e.source == chain[-1] else e
+            for e in edges
+            if e.source not in chain[:-1]
+        ]
+        nodes = [n for n in nodes if n.id not in members]
+
     # Find entry point: the node that has no incoming edges
-    targets = {e["target"] for e in edges}
-    entry_candidates = [n["id"] for n in nodes if n["id"] not in targets]
+    targets = {e.target for e in edges}
+    entry_candidates = [n.id for n in nodes if n.id not in targets]
     if not entry_candidates:
         # All nodes have incoming edges (pure cycle) — use first node
-        entry_candidates = [nodes[0]["id"]]
+        entry_candidates = [nodes[0].id]
     entry_node_id = entry_candidates[0]
 
     # Find terminal nodes: nodes that have no outgoing edges
-    sources = {e["source"] for e in edges}
-    terminal_nodes = {n["id"] for n in nodes if n["id"] not in sources}
+    sources = {e.source for e in edges}
+    terminal_nodes = {n.id for n in nodes if n.id not in sources}
 
     # Build the StateGraph
     graph = StateGraph(CouncilState)
-
-    # Register all nodes
-    all_node_ids = []
-    for node in nodes:
-        nid = node["id"]
-        all_node_ids.append(nid)
-        label = node.get("label", nid)
-        system_prompt = node.get("systemPrompt", f"You are {label}.")
-        model_name = node.get("model", "claude-3-5-sonnet")
-        tools_config = node.get("tools")
-
-        if _is_critic_like(system_prompt):
-            node_fn = _make_critic_node(
-                nid, label, system_prompt, model_name, tools_config
-            )
-        else:
-            node_fn = _make_agent_node(
-                nid, label, system_prompt, model_name, tools_config
-            )
-
+    for nid, node_fn in node_fns.items():
         graph.add_node(nid, node_fn)
 
     # Set entry point
     graph.set_entry_point(entry_node_id)
 
     # Group edges by source
-    edges_by_source: Dict[str, Dict[str, list]] = {}
+    edges_by_source: Dict[str, Dict[str, List[_EdgeSpec]]] = {}
     for edge in edges:
-        src = edge["source"]
-        if src not in edges_by_source:
-            edges_by_source[src] = {"linear": [], "conditional": []}
-        if edge.get("type") == "conditional":
-            edges_by_source[src]["conditional"].append(edge)
+        if edge.source not in edges_by_source:
+            edges_by_source[edge.source] = {"linear": [], "conditional": []}
+        if edge.type == "conditional":
+            edges_by_source[edge.source]["conditional"].append(edge)
         else:
-            edges_by_source[src]["linear"].append(edge)
+            edges_by_source[edge.source]["linear"].append(edge)
 
     # Add edges
     for source_id, grouped in edges_by_source.items():
@@ -427,26 +618,44 @@ def build_graph_from_blueprint(
 
         if conditional:
             # Build conditional routing
-            linear_target = linear[0]["target"] if linear else None
-            router = _make_conditional_router(source_id, conditional, linear_target)
+            linear_target = linear[0].target if linear else None
+            router = _make_conditional_router(
+                source_id,
+                [{"target": ce.target, "condition": ce.condition} for ce in conditional],
+                linear_target,
+            )
 
             # Build the mapping dict for add_conditional_edges
             route_map: Dict[str, str] = {}
             for ce in conditional:
-                route_map[ce["target"]] = ce["target"]
+                route_map[ce.target] = ce.target
             if linear_target:
                 route_map[linear_target] = linear_target
 
             graph.add_conditional_edges(source_id, router, route_map)
         elif linear:
             # Simple linear edge (only one target expected)
-            graph.add_edge(source_id, linear[0]["target"])
+            graph.add_edge(source_id, linear[0].target)
 
     # Terminal nodes → END
     for tid in terminal_nodes:
         if tid not in edges_by_source:
             graph.add_edge(tid, END)
 
+    return graph, list(node_fns)
+
+
+@lru_cache(maxsize=64)
+def _compile_cached(fingerprint: str, god_mode: bool, web_search_enabled: bool) -> Any:
+    """
+    Compile the graph for a canonical blueprint JSON string.
+
+    ``web_search_enabled`` is only part of the cache key: tool resolution
+    drops web search when TAVILY_API_KEY is unset, so graphs built with and
+    without the key must not share a cache entry.
+    """
+    graph, all_node_ids = _assemble_graph(json.loads(fingerprint))
+
     # God Mode: interrupt before every node so the user can approve/reject
     if god_mode:
         return graph.compile(interrupt_before=all_node_ids)
@@ -454,6 +663,39 @@ def build_graph_from_blueprint(
     return graph.compile()
 
 
+def build_graph_from_blueprint(
+    blueprint: dict,
+    god_mode: bool = False,
+) -> Any:
+    """
+    Dynamically construct a compiled LangGraph from a CouncilBlueprint JSON.
+
+    Compiled graphs hold no per-run state (no checkpointer), so they are
+    memoized on the blueprint's canonical JSON and reused across runs.
+
+    Args:
+        blueprint: A dict matching the CouncilBlueprint schema:
+            {
+                "version": 1,
+                "name": "...",
+                "nodes": [{"id", "label", "systemPrompt", "model", "tools", "position"}],
+                "edges": [{"id", "source", "target", "type", "condition?"}]
+            }
+        god_mode: If True, compile with interrupt_before on all nodes so the
+                  user can approve/reject at each step (Human-in-the-Loop).
+
+    Returns:
+        A compiled LangGraph StateGraph ready for invocation.
+
+    Raises:
+        ValueError: If the blueprint is invalid (malformed, no nodes, etc.)
+    """
+    fingerprint = json.dumps(blueprint, sort_keys=True)
+    return _compile_cached(
+        fingerprint, god_mode, bool(os.environ.get("TAVILY_API_KEY"))
+    )
+
+
 async def run_blueprint_council_async(
     blueprint: dict,
     input_topic: str,
@@ -482,11 +724,7 @@ async def run_blueprint_council_async(
 
     if god_mode:
         checkpointer = MemorySaver()
-        nodes_list = blueprint.get("nodes", [])
-        all_node_ids = [n["id"] for n in nodes_list]
-        compiled_graph = _build_graph_with_checkpointer(
-            blueprint, checkpointer, all_node_ids
-        )
+        compiled_graph = _build_graph_with_checkpointer(blueprint, checkpointer)
 
         initial_state = CouncilState(
             input_topic=input_topic,
@@ -551,79 +789,18 @@ _god_mode_sessions: Dict[str, dict] = {}
 def _build_graph_with_checkpointer(
     blueprint: dict,
     checkpointer: Any,
-    interrupt_node_ids: List[str],
+    interrupt_node_ids: Optional[List[str]] = None,
 ) -> Any:
-    """Build a compiled graph with a checkpointer for god mode."""
-    nodes = blueprint.get("nodes", [])
-    edges = blueprint.get("edges", [])
-
-    if not nodes:
-        raise ValueError("Blueprint has no nodes.")
-
-    targets = {e["target"] for e in edges}
-    entry_candidates = [n["id"] for n in nodes if n["id"] not in targets]
-    if not entry_candidates:
-        entry_candidates = [nodes[0]["id"]]
-    entry_node_id = entry_candidates[0]
-
-    sources = {e["source"] for e in edges}
-    terminal_nodes = {n["id"] for n in nodes if n["id"] not in sources}
-
-    graph = StateGraph(CouncilState)
-
-    for node in nodes:
-        nid = node["id"]
-        label = node.get("label", nid)
-        system_prompt = node.get("systemPrompt", f"You are {label}.")
-        model_name = node.get("model", "claude-3-5-sonnet")
-        tools_config = node.get("tools")
-
-        if _is_critic_like(system_prompt):
-            node_fn = _make_critic_node(
-                nid, label, system_prompt, model_name, tools_config
-            )
-        else:
-            node_fn = _make_agent_node(
-                nid, label, system_prompt, model_name, tools_config
-            )
-
-        graph.add_node(nid, node_fn)
-
-    graph.set_entry_point(entry_node_id)
-
-    edges_by_source: Dict[str, Dict[str, list]] = {}
-    for edge in edges:
-        src = edge["source"]
-        if src not in edges_by_source:
-            edges_by_source[src] = {"linear": [], "conditional": []}
-        if edge.get("type") == "conditional":
-            edges_by_source[src]["conditional"].append(edge)
-        else:
-            edges_by_source[src]["linear"].append(edge)
-
-    for source_id, grouped in edges_by_source.items():
-        linear = grouped["linear"]
-        conditional = grouped["conditional"]
-
-        if conditional:
-            linear_target = linear[0]["target"] if linear else None
-            router = _make_conditional_router(source_id, conditional, linear_target)
-            route_map: Dict[str, str] = {}
-            for ce in conditional:
-                route_map[ce["target"]] = ce["target"]
-            if linear_target:
-                route_map[linear_target] = linear_target
-            graph.add_conditional_edges(source_id, router, route_map)
-        elif linear:
-            graph.add_edge(source_id, linear[0]["target"])
+    """
+    Build a compiled graph with a checkpointer for god mode.
 
-    for tid in terminal_nodes:
-        if tid not in edges_by_source:
-            graph.add_edge(tid, END)
+    Interrupts before every registered node unless interrupt_node_ids is given.
+    """
+    graph, node_ids = _assemble_graph(blueprint)
 
     return graph.compile(
         checkpointer=checkpointer,
-        interrupt_before=interrupt_node_ids,
+        interrupt_before=interrupt_node_ids if interrupt_node_ids is not None else node_ids,
     )
 
 
@@ -631,6 +808,7 @@ async def resume_god_mode(
     run_id: str,
     action: str = "approve",
     modified_state: Optional[dict] = None,
+    sessions: Optional[Dict[str, dict]] = None,
 ) -> Optional[CouncilState]:
     """
     Resume a paused god mode run after human approval.
@@ -639,17 +817,22 @@ async def resume_god_mode(
         run_id:         The run ID of the paused session.
         action:         "approve" to continue, "reject" to stop.
         modified_state: Optional partial state override (for "modify" action).
+        sessions:       Session registry to use; defaults to the module-level
+                        registry of paused runs.
 
     Returns:
         The next CouncilState (may be another interrupt or final).
         None if the run_id is not found.
     """
-    session = _god_mode_sessions.get(run_id)
+    if sessions is None:
+        sessions = _god_mode_sessions
+
+    session = sessions.get(run_id)
     if not session:
         return None
 
     if action == "reject":
-        _god_mode_sessions.pop(run_id, None)
+        sessions.pop(run_id, None)
         return None
 
     compiled_graph = session["graph"]
@@ -666,7 +849,7 @@ async def resume_god_mode(
 
     # If state indicates completion, clean up
     if state and state.get("route_decision") == "done":
-        _god_mode_sessions.pop(run_id, None)
+        sessions.pop(run_id, None)
 
     return state
 
@@ -0,0 +1,100 @@
+"""
+PDF Extraction — in-process page text extraction with PyMuPDF or pypdf.
+
+Used by the PDF Reader tool. Kept outside the ``tools`` package, which pulls
+in LangChain and Tavily on import, so that spawned extraction workers only
+pay for importing this module and the PDF library.
+"""
+
+import mmap
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+
+# pypdf skips pages whose content stream is larger than this and shows text
+# in fewer than this fraction of its operators.
+_GRAPHICS_PAGE_BYTES = 2_000_000
+_MIN_TEXT_OP_RATIO = 0.01
+
+
+def import_fitz():
+    """Return the PyMuPDF module, or None when it is not installed."""
+    try:
+        import fitz
+    except ImportError:
+        return None
+    return fitz
+
+
+@contextmanager
+def _pypdf_reader(file_path: str) -> Iterator[Any]:
+    """
+    Open a pypdf reader over a read-only mmap of the file.
+
+    pypdf then reads objects lazily from the mapping, and the OS can evict
+    pages it no longer needs, instead of the whole file landing on the
+    Python heap. (PyMuPDF already maps files it opens by path.)
+    """
+    from pypdf import PdfReader
+
+    with (
+        open(file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        yield PdfReader(mm, strict=False)
+
+
+def page_count(file_path: str) -> int:
+    """Return the number of pages in a PDF."""
+    fitz = import_fitz()
+    if fitz is not None:
+        doc = fitz.open(file_path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    with _pypdf_reader(file_path) as reader:
+        return len(reader.pages)
+
+
+def _fitz_page_text(page) -> str:
+    """Text of a PyMuPDF page, taken from its text blocks only (type 0)."""
+    return "\n".join(block[4] for block in page.get_text("blocks") if block[6] == 0)
+
+
+def _pypdf_page_text(page) -> str:
+    """
+    Text of a pypdf page, skipping pages that are almost entirely graphics.
+
+    pypdf dispatches every content-stream operator while extracting, so a
+    multi-megabyte vector drawing can take seconds to yield a few labels.
+    Large streams where under _MIN_TEXT_OP_RATIO of the lines show text
+    (content streams are roughly one operator per line) are skipped.
+    """
+    contents = page.get_contents()
+    if contents is not None:
+        data = contents.get_data()
+        if len(data) > _GRAPHICS_PAGE_BYTES:
+            text_ops = data.count(b"Tj") + data.count(b"TJ")
+            if text_ops < _MIN_TEXT_OP_RATIO * (data.count(b"\n") + 1):
+                return ""
+    return page.extract_text(extraction_mode="plain")
+
+
+def extract_page_range(args: tuple) -> List[tuple]:
+    """
+    Extract ``(page_num, text)`` for pages ``start`` to ``stop`` of a PDF.
+
+    Module-level and tuple-argument so it can be shipped to a process pool.
+    """
+    file_path, start, stop = args
+    fitz = import_fitz()
+    if fitz is not None:
+        doc = fitz.open(file_path)
+        try:
+            return [(i, _fitz_page_text(doc.load_page(i))) for i in range(start, stop)]
+        finally:
+            doc.close()
+
+    with _pypdf_reader(file_path) as reader:
+        return [(i, _pypdf_page_text(reader.pages[i])) for i in range(start, stop)]
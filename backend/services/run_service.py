@@ -71,8 +71,9 @@ async def update_run(
         if hasattr(run, key):
             setattr(run, key, value)
 
-    # Auto-set completed_at when status becomes terminal
-    if updates.get("status") in ("completed", "failed"):
+    # Auto-set completed_at when status becomes terminal, unless the caller
+    # supplied an explicit timestamp
+    if updates.get("status") in ("completed", "failed") and "completed_at" not in updates:
         run.completed_at = datetime.now(timezone.utc)
 
     await session.commit()
@@ -0,0 +1,173 @@
+"""
+Shared pytest fixtures for the CouncilOS backend tests.
+
+All LLM and tool doubles are mocks — no real API calls are made.
+"""
+
+import os
+import sys
+
+# Make the backend packages (agents, services, tools, ...) importable.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+import pytest_asyncio
+from unittest.mock import MagicMock, Mock
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from models.blueprint import Base
+import models.council_run  # noqa: F401  (registers CouncilRun on Base)
+
+
+# ---------------------------------------------------------------------------
+# Test database
+# ---------------------------------------------------------------------------
+
+_WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def make_test_engine(db_name: str):
+    """
+    Build an async engine on a named shared-cache in-memory SQLite database.
+
+    Every connection attaches to the same pages instead of opening a fresh,
+    empty ":memory:" database, and StaticPool keeps that single connection
+    (and therefore the schema) alive between tests. The name includes the
+    pytest-xdist worker id so parallel workers never share a DB.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///file:{db_name}_{_WORKER_ID}?mode=memory&cache=shared&uri=true",
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"uri": True, "check_same_thread": False},
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        # The sqlite3 driver manages transactions itself and breaks SAVEPOINT
+        # semantics; hand transaction control to SQLAlchemy instead.
+        dbapi_connection.isolation_level = None
+        # In-memory databases report journal_mode "memory"; WAL and
+        # busy_timeout take effect once the DB is file-backed.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+test_engine = make_test_engine("council_tests")
+
+TestSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    join_transaction_mode="create_savepoint",
+)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def schema():
+    """Create the tables once per test session."""
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await test_engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(schema):
+    """
+    Yield a session bound to an outer transaction that is rolled back after
+    the test. Commits in service and route code only release a SAVEPOINT.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        async with TestSessionLocal(bind=conn) as sess:
+            yield sess
+        await trans.rollback()
+
+
+# ---------------------------------------------------------------------------
+# LLM and tool doubles
+# ---------------------------------------------------------------------------
+
+class FakeLLM:
+    """The slice of the chat-model API that the graph nodes call."""
+
+    def invoke(self, messages):
+        ...
+
+    def bind_tools(self, tools):
+        ...
+
+
+class FakeTool:
+    """The slice of the LangChain tool API that the graph nodes call."""
+
+    name = ""
+
+    def invoke(self, args):
+        ...
+
+
+@pytest.fixture
+def llm_mock():
+    """A chat-model mock that rejects attributes FakeLLM does not declare."""
+    return Mock(spec_set=FakeLLM)
+
+
+@pytest.fixture
+def tool_mock():
+    """A tool mock that rejects attributes FakeTool does not declare."""
+    return Mock(spec_set=FakeTool)
+
+
+@pytest.fixture(autouse=True)
+def _patch_anthropic(monkeypatch):
+    """
+    Replace ChatAnthropic in the fixed-pipeline agents with one mock per test.
+
+    Tests that exercise an agent set ``_patch_anthropic.return_value.invoke.return_value``.
+    """
+    fake = MagicMock()
+    for mod in ("agents.critic_agent", "agents.master_agent", "agents.writer_agent"):
+        monkeypatch.setattr(f"{mod}.ChatAnthropic", fake)
+    yield fake
+
+
+# ---------------------------------------------------------------------------
+# Model templates
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="session")
+def _run_template():
+    """Constructor kwargs for a completed CouncilRun; copy before overriding."""
+    from datetime import datetime, timezone
+
+    return {
+        "id": "tpl",
+        "blueprint_id": "bp",
+        "input_topic": "T",
+        "status": "completed",
+        "execution_mode": "auto-pilot",
+        "final_draft": "F",
+        "critic_score": 8.5,
+        "iteration_count": 3,
+        "active_node": "done",
+        "error": None,
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "completed_at": datetime(2026, 1, 1, 0, 5, tzinfo=timezone.utc),
+    }
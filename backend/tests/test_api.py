@@ -4,11 +4,6 @@ Integration tests for the FastAPI REST endpoints.
 Uses httpx.AsyncClient with the TestClient pattern — no real LLM calls.
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
@@ -19,7 +14,7 @@ from api.run_store import run_store
 
 @pytest.fixture(autouse=True)
 def clean_run_store():
-    """Reset the run store before each test."""
+    """Reset the run store before and after each test."""
     run_store._store.clear()
     yield
     run_store._store.clear()
@@ -97,3 +92,25 @@ class TestGetCouncilResult:
         data = response.json()
         assert data["status"] == "failed"
         assert "timeout" in data["error"]
+
+
+class TestUploadPdf:
+    @pytest.mark.parametrize("query, replace", [("", False), ("?replace=true", True)])
+    def test_upload_replaces_by_name_only_when_asked(self, query, replace):
+        with patch("tools.pdf_reader.ingest_pdf", return_value=4) as ingest:
+            response = client.post(
+                f"/api/councils/upload-pdf{query}",
+                files={"file": ("report.pdf", b"%PDF-1.4\n", "application/pdf")},
+            )
+
+        assert response.status_code == 200
+        assert response.json()["chunks_ingested"] == 4
+        assert ingest.call_args.kwargs == {"source": "report.pdf", "replace": replace}
+        assert ("replaced" in response.json()["message"]) is replace
+
+    def test_upload_rejects_non_pdf(self):
+        response = client.post(
+            "/api/councils/upload-pdf",
+            files={"file": ("notes.txt", b"hello", "text/plain")},
+        )
+        assert response.status_code == 400
@@ -4,53 +4,52 @@ Integration tests for the blueprint CRUD REST endpoints.
 Overrides the database dependency to use an in-memory SQLite database.
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import copy
+from contextvars import ContextVar
 
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.blueprint import Base
+from models.blueprint import Blueprint
 from database import get_session
 from main import app
 
 
 # ---------------------------------------------------------------------------
-# Test database setup
+# App client
 # ---------------------------------------------------------------------------
 
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestSessionLocal = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+# The per-test session the app's get_session override hands to route handlers.
+_current_session: ContextVar[AsyncSession] = ContextVar("_current_session")
 
 
 async def override_get_session():
-    async with TestSessionLocal() as session:
-        yield session
-
+    yield _current_session.get()
 
-app.dependency_overrides[get_session] = override_get_session
 
-
-@pytest_asyncio.fixture(autouse=True)
-async def setup_db():
-    """Create and tear down tables for each test."""
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+@pytest_asyncio.fixture
+async def session(session):
+    """The shared rolled-back session, also handed to route handlers."""
+    token = _current_session.set(session)
+    yield session
+    _current_session.reset(token)
 
 
-@pytest_asyncio.fixture
-async def client():
+@pytest_asyncio.fixture(scope="session")
+async def app_client():
+    """One ASGI client for the whole session; the DB is isolated per test."""
+    app.dependency_overrides[get_session] = override_get_session
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as c:
         yield c
+    app.dependency_overrides.pop(get_session, None)
+
+
+@pytest.fixture
+def client(app_client, session):
+    return app_client
 
 
 # ---------------------------------------------------------------------------
@@ -83,6 +82,25 @@ SAMPLE_BLUEPRINT = {
     ],
 }
 
+# Payload variants, deep-copied so no test shares nested lists with another.
+SAMPLE_SECOND = {**copy.deepcopy(SAMPLE_BLUEPRINT), "name": "Second Council"}
+SAMPLE_EMPTY_NAME = {**copy.deepcopy(SAMPLE_BLUEPRINT), "name": ""}
+SAMPLE_NO_NAME = {
+    k: v for k, v in copy.deepcopy(SAMPLE_BLUEPRINT).items() if k != "name"
+}
+
+
+@pytest_asyncio.fixture
+async def two_blueprints(session):
+    """Insert two blueprints in a single transaction and return their ids."""
+    blueprints = [
+        Blueprint(**copy.deepcopy(SAMPLE_BLUEPRINT)),
+        Blueprint(**copy.deepcopy(SAMPLE_SECOND)),
+    ]
+    session.add_all(blueprints)
+    await session.commit()
+    return [bp.id for bp in blueprints]
+
 
 # ---------------------------------------------------------------------------
 # Tests
@@ -100,17 +118,11 @@ class TestBlueprintEndpoints:
         assert "id" in data
 
     @pytest.mark.asyncio
-    async def test_list_blueprints(self, client):
-        await client.post("/api/councils/", json=SAMPLE_BLUEPRINT)
-        await client.post(
-            "/api/councils/",
-            json={**SAMPLE_BLUEPRINT, "name": "Second Council"},
-        )
-
+    async def test_list_blueprints(self, client, two_blueprints):
         response = await client.get("/api/councils/")
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
+        assert sorted(bp["id"] for bp in data) == sorted(two_blueprints)
 
     @pytest.mark.asyncio
     async def test_get_blueprint(self, client):
@@ -147,15 +159,13 @@ class TestBlueprintEndpoints:
         assert response.status_code == 404
 
     @pytest.mark.asyncio
-    async def test_delete_blueprint(self, client):
+    async def test_delete_blueprint(self, client, session):
         create_resp = await client.post("/api/councils/", json=SAMPLE_BLUEPRINT)
         bp_id = create_resp.json()["id"]
 
         delete_resp = await client.delete(f"/api/councils/{bp_id}")
         assert delete_resp.status_code == 204
-
-        get_resp = await client.get(f"/api/councils/{bp_id}")
-        assert get_resp.status_code == 404
+        assert await session.get(Blueprint, bp_id) is None
 
     @pytest.mark.asyncio
     async def test_delete_nonexistent_returns_404(self, client):
@@ -164,13 +174,10 @@ class TestBlueprintEndpoints:
 
     @pytest.mark.asyncio
     async def test_create_rejects_missing_name(self, client):
-        payload = {**SAMPLE_BLUEPRINT}
-        del payload["name"]
-        response = await client.post("/api/councils/", json=payload)
+        response = await client.post("/api/councils/", json=SAMPLE_NO_NAME)
         assert response.status_code == 422
 
     @pytest.mark.asyncio
     async def test_create_rejects_empty_name(self, client):
-        payload = {**SAMPLE_BLUEPRINT, "name": ""}
-        response = await client.post("/api/councils/", json=payload)
+        response = await client.post("/api/councils/", json=SAMPLE_EMPTY_NAME)
         assert response.status_code == 422
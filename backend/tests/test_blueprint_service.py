@@ -4,16 +4,10 @@ Tests for the blueprint CRUD service and API endpoints.
 Uses an in-memory SQLite database for isolation.
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from models.blueprint import Base
+from models.blueprint import Blueprint
 from services.blueprint_service import (
     create_blueprint,
     delete_blueprint,
@@ -23,29 +17,6 @@ from services.blueprint_service import (
 )
 
 
-# ---------------------------------------------------------------------------
-# Test database setup (in-memory SQLite)
-# ---------------------------------------------------------------------------
-
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestSessionLocal = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
-
-
-@pytest_asyncio.fixture
-async def session():
-    """Create tables and yield a fresh session for each test."""
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with TestSessionLocal() as sess:
-        yield sess
-
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-
 # ---------------------------------------------------------------------------
 # Sample data
 # ---------------------------------------------------------------------------
@@ -74,60 +45,64 @@ SAMPLE_EDGES = [
 ]
 
 
+@pytest_asyncio.fixture
+async def seeded_bp(session):
+    """Insert one blueprint row directly, bypassing the service layer."""
+    bp = Blueprint(id="bp-1", name="Seed", version=1, nodes=SAMPLE_NODES, edges=SAMPLE_EDGES)
+    session.add(bp)
+    await session.flush()
+    return bp
+
+
 # ---------------------------------------------------------------------------
 # Tests
 # ---------------------------------------------------------------------------
 
 class TestBlueprintCRUD:
     @pytest.mark.asyncio
-    async def test_create_blueprint(self, session):
-        bp = await create_blueprint(session, "Test Council", SAMPLE_NODES, SAMPLE_EDGES)
+    @pytest.mark.parametrize(
+        "name,blueprint_id",
+        [("Test Council", None), ("Custom ID", "my-custom-id")],
+    )
+    async def test_create_blueprint(self, session, name, blueprint_id):
+        bp = await create_blueprint(
+            session, name, SAMPLE_NODES, SAMPLE_EDGES, blueprint_id=blueprint_id
+        )
         assert bp.id is not None
-        assert bp.name == "Test Council"
+        if blueprint_id:
+            assert bp.id == blueprint_id
+        assert bp.name == name
         assert bp.version == 1
         assert len(bp.nodes) == 2
         assert len(bp.edges) == 1
 
     @pytest.mark.asyncio
-    async def test_create_with_custom_id(self, session):
-        bp = await create_blueprint(
-            session, "Custom ID", SAMPLE_NODES, SAMPLE_EDGES, blueprint_id="my-custom-id"
-        )
-        assert bp.id == "my-custom-id"
-
-    @pytest.mark.asyncio
-    async def test_get_blueprint(self, session):
-        bp = await create_blueprint(session, "Get Test", SAMPLE_NODES, SAMPLE_EDGES)
-        fetched = await get_blueprint(session, bp.id)
-        assert fetched is not None
-        assert fetched.name == "Get Test"
+    @pytest.mark.parametrize(
+        "bp_id,expected_name",
+        [("bp-1", "Seed"), ("nonexistent-id", None)],
+        ids=["existing", "missing"],
+    )
+    async def test_get_blueprint(self, session, seeded_bp, bp_id, expected_name):
+        fetched = await get_blueprint(session, bp_id)
+        assert (fetched.name if fetched else None) == expected_name
 
     @pytest.mark.asyncio
-    async def test_get_nonexistent_returns_none(self, session):
-        result = await get_blueprint(session, "nonexistent-id")
-        assert result is None
-
-    @pytest.mark.asyncio
-    async def test_list_blueprints(self, session):
-        await create_blueprint(session, "First", SAMPLE_NODES, SAMPLE_EDGES)
-        await create_blueprint(session, "Second", SAMPLE_NODES, SAMPLE_EDGES)
+    async def test_list_blueprints(self, session, seeded_bp):
         all_bps = await list_blueprints(session)
-        assert len(all_bps) == 2
+        assert [bp.id for bp in all_bps] == [seeded_bp.id]
 
     @pytest.mark.asyncio
-    async def test_update_blueprint_name(self, session):
+    @pytest.mark.parametrize(
+        "updates",
+        [{"name": "Renamed"}, {"nodes": [SAMPLE_NODES[0]]}],
+        ids=["name", "nodes"],
+    )
+    async def test_update_blueprint(self, session, updates):
         bp = await create_blueprint(session, "Original", SAMPLE_NODES, SAMPLE_EDGES)
-        updated = await update_blueprint(session, bp.id, name="Renamed")
+        updated = await update_blueprint(session, bp.id, **updates)
         assert updated is not None
-        assert updated.name == "Renamed"
-
-    @pytest.mark.asyncio
-    async def test_update_blueprint_nodes(self, session):
-        bp = await create_blueprint(session, "Nodes Test", SAMPLE_NODES, SAMPLE_EDGES)
-        new_nodes = [SAMPLE_NODES[0]]  # Remove second node
-        updated = await update_blueprint(session, bp.id, nodes=new_nodes)
-        assert updated is not None
-        assert len(updated.nodes) == 1
+        for field, value in updates.items():
+            assert getattr(updated, field) == value
 
     @pytest.mark.asyncio
     async def test_update_nonexistent_returns_none(self, session):
@@ -135,16 +110,14 @@ class TestBlueprintCRUD:
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_delete_blueprint(self, session):
-        bp = await create_blueprint(session, "To Delete", SAMPLE_NODES, SAMPLE_EDGES)
-        deleted = await delete_blueprint(session, bp.id)
-        assert deleted is True
-        assert await get_blueprint(session, bp.id) is None
-
-    @pytest.mark.asyncio
-    async def test_delete_nonexistent_returns_false(self, session):
-        deleted = await delete_blueprint(session, "ghost-id")
-        assert deleted is False
+    @pytest.mark.parametrize("exists", [True, False], ids=["existing", "missing"])
+    async def test_delete_blueprint(self, session, exists):
+        bp_id = "ghost-id"
+        if exists:
+            bp_id = (await create_blueprint(session, "To Delete", SAMPLE_NODES, SAMPLE_EDGES)).id
+        deleted = await delete_blueprint(session, bp_id)
+        assert deleted is exists
+        assert await get_blueprint(session, bp_id) is None
 
     @pytest.mark.asyncio
     async def test_to_dict_format(self, session):
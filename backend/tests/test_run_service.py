@@ -1,47 +1,20 @@
 """
 Tests for the run history service and CouncilRun model.
 
-DB-backed tests use an in-memory SQLite database for full isolation —
-the same approach as test_blueprint_service.py.
+DB-backed tests use the rolled-back in-memory SQLite session from
+conftest.py, shared with the blueprint tests.
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from datetime import datetime, timezone
 
 import pytest
-import pytest_asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from unittest.mock import AsyncMock, patch
 
-from models.blueprint import Base  # CouncilRun shares this Base
+from api.run_history_routes import list_all_runs
+from models.council_run import CouncilRun
 from services.run_service import create_run, get_run, list_runs, update_run
 
 
-# ---------------------------------------------------------------------------
-# In-memory SQLite test database
-# ---------------------------------------------------------------------------
-
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestSessionLocal = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
-
-
-@pytest_asyncio.fixture
-async def session():
-    """Create all tables and yield a fresh session. Tables are dropped after each test."""
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with TestSessionLocal() as sess:
-        yield sess
-
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-
 # ---------------------------------------------------------------------------
 # CouncilRun model serialization (no DB required)
 # ---------------------------------------------------------------------------
@@ -49,24 +22,8 @@ async def session():
 class TestCouncilRunModel:
     """Tests for the CouncilRun SQLAlchemy model."""
 
-    def test_to_dict_serialization(self):
-        from models.council_run import CouncilRun
-        from datetime import datetime, timezone
-
-        run = CouncilRun(
-            id="test-id",
-            blueprint_id="bp-id",
-            input_topic="Test topic",
-            status="completed",
-            execution_mode="auto-pilot",
-            final_draft="Final text",
-            critic_score=8.5,
-            iteration_count=3,
-            active_node="done",
-            error=None,
-            created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
-            completed_at=datetime(2026, 1, 1, 0, 5, tzinfo=timezone.utc),
-        )
+    def test_to_dict_serialization(self, _run_template):
+        run = CouncilRun(**{**_run_template, "id": "test-id", "blueprint_id": "bp-id"})
 
         d = run.to_dict()
         assert d["id"] == "test-id"
@@ -77,17 +34,14 @@ class TestCouncilRunModel:
         assert d["created_at"] is not None
         assert d["completed_at"] is not None
 
-    def test_to_dict_with_none_timestamps(self):
-        from models.council_run import CouncilRun
-
-        run = CouncilRun(
-            id="test-id",
-            input_topic="Test",
-            status="pending",
-            execution_mode="god-mode",
-            created_at=None,
-            completed_at=None,
-        )
+    def test_to_dict_with_none_timestamps(self, _run_template):
+        run = CouncilRun(**{
+            **_run_template,
+            "status": "pending",
+            "execution_mode": "god-mode",
+            "created_at": None,
+            "completed_at": None,
+        })
 
         d = run.to_dict()
         assert d["created_at"] is None
@@ -247,6 +201,17 @@ class TestUpdateRun:
         assert updated.status == "failed"
         assert updated.completed_at is not None
 
+    @pytest.mark.asyncio
+    async def test_update_run_keeps_explicit_completed_at(self, session):
+        finished = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        await create_run(session, run_id="run-u7", input_topic="Topic")
+        updated = await update_run(
+            session, "run-u7", {"status": "completed", "completed_at": finished}
+        )
+
+        assert updated is not None
+        assert updated.completed_at.replace(tzinfo=timezone.utc) == finished
+
     @pytest.mark.asyncio
     async def test_update_run_does_not_set_completed_at_for_running(self, session):
         await create_run(session, run_id="run-u4", input_topic="Topic")
@@ -296,17 +261,8 @@ class TestRunHistoryRoutes:
     @pytest.mark.asyncio
     async def test_list_runs_empty(self):
         """List runs returns empty list when no runs exist."""
-        from api.run_history_routes import list_all_runs
-
-        mock_session = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = []
-        mock_result.scalars.return_value = mock_scalars
-        mock_session.execute.return_value = mock_result
-
-        with patch("services.run_service.list_runs") as mock_list:
-            mock_list.return_value = []
-            result = await list_all_runs(limit=50, offset=0, session=mock_session)
-            assert result == []
+        session = AsyncMock()
+        with patch("api.run_history_routes.list_runs", return_value=[]) as mock_list:
+            result = await list_all_runs(limit=50, offset=0, session=session)
+        assert result == []
+        mock_list.assert_awaited_once_with(session, limit=50, offset=0)
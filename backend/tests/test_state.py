@@ -1,10 +1,5 @@
 """Tests for CouncilState structure and graph_builder helpers."""
 
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 from state import CouncilState, APPROVAL_THRESHOLD, MAX_ITERATIONS
 from services.graph_builder import create_initial_state
 
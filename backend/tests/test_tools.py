@@ -4,29 +4,56 @@ Tests for agent tools (web search and PDF reader).
 All external API calls are mocked — no real calls to Tavily or ChromaDB.
 """
 
-import sys
+import importlib
 import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+
+import services.pdf_extraction as pdf_extraction_module
+import tools.pdf_reader as pdf_reader_module
+from tools.pdf_reader import _chunk_words, ingest_pdf, ingest_pdfs, pdf_search
+from tools.web_search import create_web_search_tool, web_search
+
+# The tools package re-exports the web_search tool under the submodule's name,
+# so fetch the module itself for attribute patching.
+web_search_module = importlib.import_module("tools.web_search")
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from unittest.mock import patch, MagicMock
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PAGE1_TEXT = "This is the first page with some content " * 20
+_PAGE2_TEXT = "Second page about machine learning " * 20
+
+
+@pytest.fixture
+def tavily_client(monkeypatch):
+    """Set a Tavily key and route web_search to a mock client."""
+    client = MagicMock()
+    monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+    monkeypatch.setattr(web_search_module, "_client_factory", lambda api_key: client)
+    monkeypatch.setattr(web_search_module, "_client_cache", {})
+    return client
 
 
 class TestWebSearchTool:
     """Tests for the Tavily web search tool."""
 
-    @patch.dict(os.environ, {"TAVILY_API_KEY": ""}, clear=False)
-    def test_web_search_returns_error_without_api_key(self):
-        from tools.web_search import web_search
-
+    def test_web_search_returns_error_without_api_key(self, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_KEY", "")
         result = web_search.invoke({"query": "test query"})
         assert "TAVILY_API_KEY" in result
 
-    @patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}, clear=False)
-    @patch("tavily.TavilyClient")
-    def test_web_search_returns_formatted_results(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client.search.return_value = {
+    def test_web_search_returns_formatted_results(self, tavily_client):
+        tavily_client.search.return_value = {
             "results": [
                 {
                     "title": "Test Result",
@@ -35,59 +62,219 @@ class TestWebSearchTool:
                 }
             ]
         }
-        mock_client_cls.return_value = mock_client
-
-        from tools.web_search import web_search
 
         result = web_search.invoke({"query": "test query"})
         assert "Test Result" in result
         assert "https://example.com" in result
         assert "Some content here" in result
 
-    @patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}, clear=False)
-    @patch("tavily.TavilyClient")
-    def test_web_search_handles_empty_results(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client.search.return_value = {"results": []}
-        mock_client_cls.return_value = mock_client
-
-        from tools.web_search import web_search
+    def test_web_search_handles_empty_results(self, tavily_client):
+        tavily_client.search.return_value = {"results": []}
 
         result = web_search.invoke({"query": "obscure query"})
         assert "No results" in result
 
-    @patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}, clear=False)
-    @patch("tavily.TavilyClient")
-    def test_web_search_handles_api_error(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client.search.side_effect = Exception("API rate limit")
-        mock_client_cls.return_value = mock_client
+    def test_web_search_reuses_client(self, monkeypatch):
+        built = []
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        monkeypatch.setattr(web_search_module, "_client_cache", {})
+        monkeypatch.setattr(
+            web_search_module, "_client_factory", lambda api_key: built.append(api_key) or MagicMock()
+        )
 
-        from tools.web_search import web_search
+        web_search.invoke({"query": "first"})
+        web_search.invoke({"query": "second"})
+        monkeypatch.setenv("TAVILY_API_KEY", "rotated-key")
+        web_search.invoke({"query": "third"})
+
+        assert built == ["test-key", "rotated-key"]
+
+    def test_web_search_handles_api_error(self, tavily_client):
+        tavily_client.search.side_effect = Exception("API rate limit")
 
         result = web_search.invoke({"query": "test"})
         assert "Error" in result
         assert "rate limit" in result
 
 
+class TestAsyncWebSearch:
+    """Tests for the coroutine path used by ainvoke()."""
+
+    @pytest.fixture
+    def async_client(self, monkeypatch):
+        client = MagicMock()
+        client.__aenter__ = AsyncMock(return_value=client)
+        client.__aexit__ = AsyncMock(return_value=None)
+        client.search = AsyncMock()
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        monkeypatch.setattr(web_search_module, "_async_client_factory", lambda api_key: client)
+        return client
+
+    async def test_ainvoke_awaits_async_client(self, async_client):
+        async_client.search.return_value = {
+            "results": [{"title": "Async Result", "url": "https://example.com", "content": "c"}]
+        }
+
+        result = await web_search.ainvoke({"query": "test query", "max_results": 3})
+
+        assert "Async Result" in result
+        async_client.search.assert_awaited_once_with(
+            query="test query", max_results=3, search_depth="basic"
+        )
+        async_client.__aexit__.assert_awaited_once()
+
+    async def test_ainvoke_handles_api_error(self, async_client):
+        async_client.search.side_effect = Exception("API rate limit")
+
+        result = await web_search.ainvoke({"query": "test"})
+        assert "[Web Search Error] API rate limit" in result
+
+
 class TestCreateWebSearchTool:
     """Tests for the web search tool factory."""
 
-    @patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}, clear=False)
-    def test_factory_returns_tool_when_key_set(self):
-        from tools.web_search import create_web_search_tool
-
+    def test_factory_returns_tool_when_key_set(self, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
         tool = create_web_search_tool()
         assert tool is not None
 
-    @patch.dict(os.environ, {}, clear=True)
-    def test_factory_returns_none_when_key_missing(self):
-        from tools.web_search import create_web_search_tool
-
+    def test_factory_returns_none_when_key_missing(self, monkeypatch):
+        monkeypatch.delenv("TAVILY_API_KEY", raising=False)
         tool = create_web_search_tool()
         assert tool is None
 
 
+_load_embedding_function = pdf_reader_module._load_embedding_function
+
+
+@pytest.fixture(autouse=True)
+def embedder(monkeypatch):
+    """Stand in for the embedding model, so no test downloads or loads one."""
+    embedding_function = MagicMock()
+    embedding_function.embed_query.return_value = [[0.1, 0.2]]
+    monkeypatch.setattr(pdf_reader_module, "_embedding_function_cache", {})
+    monkeypatch.setattr(
+        pdf_reader_module, "_load_embedding_function", lambda model_name, device: embedding_function
+    )
+    return embedding_function
+
+
+@pytest.fixture
+def chroma_client(monkeypatch):
+    """Route _get_chroma_collection to a mock client with an empty cache."""
+    client = MagicMock()
+    monkeypatch.setattr(pdf_reader_module, "_collection_cache", {})
+    monkeypatch.setattr("chromadb.PersistentClient", lambda path: client)
+    return client
+
+
+class TestChromaCollection:
+    """Tests for collection creation."""
+
+    def test_default_embedding_function(self, chroma_client, monkeypatch):
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+        monkeypatch.delenv("CHROMA_EMBEDDING_MODEL", raising=False)
+        monkeypatch.setattr(pdf_reader_module, "_load_embedding_function", _load_embedding_function)
+
+        pdf_reader_module._get_chroma_collection()
+
+        kwargs = chroma_client.get_or_create_collection.call_args.kwargs
+        assert isinstance(kwargs["embedding_function"], DefaultEmbeddingFunction)
+        assert kwargs["embedding_function"] is pdf_reader_module._embedding_function()
+
+    def test_sentence_transformer_embedding_function(self, chroma_client, monkeypatch):
+        monkeypatch.setenv("CHROMA_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        monkeypatch.delenv("CHROMA_EMBEDDING_DEVICE", raising=False)
+        monkeypatch.setattr(pdf_reader_module, "_load_embedding_function", _load_embedding_function)
+        ef_cls = MagicMock()
+        monkeypatch.setattr(
+            "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction", ef_cls
+        )
+
+        pdf_reader_module._get_chroma_collection()
+
+        ef_cls.assert_called_once_with(
+            model_name="all-MiniLM-L6-v2", device="cpu", normalize_embeddings=True
+        )
+        kwargs = chroma_client.get_or_create_collection.call_args.kwargs
+        assert kwargs["embedding_function"] is ef_cls.return_value
+
+    def test_hnsw_metadata_defaults_and_overrides(self, chroma_client, monkeypatch):
+        for var in ("CHROMA_HNSW_M", "CHROMA_HNSW_CONSTRUCTION_EF"):
+            monkeypatch.delenv(var, raising=False)
+        # An empty value, as left by a blank line in .env, means "use the default".
+        monkeypatch.setenv("CHROMA_HNSW_NUM_THREADS", "")
+        monkeypatch.setenv("CHROMA_HNSW_SEARCH_EF", "128")
+
+        pdf_reader_module._get_chroma_collection()
+
+        metadata = chroma_client.get_or_create_collection.call_args.kwargs["metadata"]
+        assert metadata["hnsw:space"] == "cosine"
+        assert metadata["hnsw:M"] == 32
+        assert metadata["hnsw:construction_ef"] == 200
+        assert metadata["hnsw:search_ef"] == 128
+        assert metadata["hnsw:num_threads"] >= 1
+
+    def test_concurrent_first_calls_open_collection_once(self, chroma_client):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def first_call(_):
+            barrier.wait()
+            return pdf_reader_module._get_chroma_collection()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            collections = list(pool.map(first_call, range(4)))
+
+        chroma_client.get_or_create_collection.assert_called_once()
+        assert all(c is collections[0] for c in collections)
+
+
+class TestWarmPreload:
+    """Tests for the optional background warm-up at startup."""
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("CHROMA_WARM_PRELOAD", raising=False)
+        assert pdf_reader_module.start_warm_preload() is None
+
+    def test_warms_query_embedding(self, chroma_client, monkeypatch, embedder):
+        monkeypatch.setenv("CHROMA_WARM_PRELOAD", "1")
+        collection = chroma_client.get_or_create_collection.return_value
+
+        thread = pdf_reader_module.start_warm_preload()
+        thread.join(timeout=5)
+
+        assert pdf_reader_module._collection_cache["council_pdfs"] is collection
+        embedder.embed_query.assert_called_once_with(["warm-up"])
+
+    def test_logs_startup_errors(self, monkeypatch, caplog):
+        monkeypatch.setenv("CHROMA_WARM_PRELOAD", "1")
+        monkeypatch.setattr(pdf_reader_module, "_collection_cache", {})
+        monkeypatch.setattr(
+            pdf_reader_module, "_open_collection", MagicMock(side_effect=RuntimeError("down"))
+        )
+        excepthook = MagicMock()
+        monkeypatch.setattr(threading, "excepthook", excepthook)
+
+        with caplog.at_level("WARNING", logger="tools.pdf_reader"):
+            thread = pdf_reader_module.start_warm_preload()
+            thread.join(timeout=5)
+
+        excepthook.assert_not_called()
+        assert "warm-up failed" in caplog.text
+        assert caplog.records[-1].exc_info[1].args == ("down",)
+
+
+@pytest.fixture(autouse=True)
+def _clear_pdf_search_cache():
+    """Keep cached query results, embeddings and counts from leaking between tests."""
+    pdf_reader_module._invalidate_search_caches()
+    pdf_reader_module._embed_query.cache_clear()
+    yield
+    pdf_reader_module._invalidate_search_caches()
+    pdf_reader_module._embed_query.cache_clear()
+
+
 class TestPdfSearchTool:
     """Tests for the PDF reader tool."""
 
@@ -97,8 +284,6 @@ class TestPdfSearchTool:
         mock_collection.count.return_value = 0
         mock_get_collection.return_value = mock_collection
 
-        from tools.pdf_reader import pdf_search
-
         result = pdf_search.invoke({"query": "test query"})
         assert "No documents" in result
 
@@ -115,34 +300,281 @@ class TestPdfSearchTool:
         }
         mock_get_collection.return_value = mock_collection
 
-        from tools.pdf_reader import pdf_search
-
         result = pdf_search.invoke({"query": "AI concepts"})
         assert "paper.pdf" in result
         assert "First passage" in result
         assert "Page 1" in result
 
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_pdf_search_caches_repeated_queries(self, mock_get_collection):
+        mock_collection = mock_get_collection.return_value
+        mock_collection.count.return_value = 3
+        mock_collection.query.return_value = {
+            "documents": [["First passage about AI."]],
+            "metadatas": [[{"source": "paper.pdf", "page": 1}]],
+        }
+
+        first = pdf_search.invoke({"query": "AI concepts"})
+        second = pdf_search.invoke({"query": "AI concepts"})
+
+        assert first == second
+        mock_collection.query.assert_called_once()
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_pdf_search_requeries_when_count_changes(self, mock_get_collection):
+        mock_collection = mock_get_collection.return_value
+        mock_collection.count.return_value = 3
+        mock_collection.query.return_value = {"documents": [[]], "metadatas": [[]]}
+
+        pdf_search.invoke({"query": "AI concepts"})
+        # Another process added chunks; the count TTL has expired.
+        mock_collection.count.return_value = 4
+        pdf_reader_module._count_cache.clear()
+        pdf_search.invoke({"query": "AI concepts"})
+
+        assert mock_collection.query.call_count == 2
+
+    @pytest.mark.parametrize("source, where", [(None, None), ("paper.pdf", {"source": "paper.pdf"})])
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_pdf_search_source_filter(self, mock_get_collection, source, where):
+        mock_collection = mock_get_collection.return_value
+        mock_collection.count.return_value = 3
+        mock_collection.query.return_value = {"documents": [[]], "metadatas": [[]]}
+
+        pdf_search.invoke({"query": "AI concepts", "source": source})
+
+        assert mock_collection.query.call_args.kwargs.get("where") == where
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_pdf_search_counts_once_within_ttl(self, mock_get_collection):
+        mock_collection = mock_get_collection.return_value
+        mock_collection.count.return_value = 3
+        mock_collection.query.return_value = {"documents": [[]], "metadatas": [[]]}
+
+        pdf_search.invoke({"query": "first"})
+        pdf_search.invoke({"query": "second"})
+
+        mock_collection.count.assert_called_once()
+
+    def test_collection_count_cached_per_collection(self):
+        first = MagicMock()
+        first.name = "council_pdfs"
+        first.count.return_value = 3
+        second = MagicMock()
+        second.name = "other_pdfs"
+        second.count.return_value = 7
+
+        assert pdf_reader_module._collection_count(first) == 3
+        assert pdf_reader_module._collection_count(second) == 7
+        assert pdf_reader_module._collection_count(first) == 3
+        first.count.assert_called_once()
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_pdf_search_reuses_query_embedding(self, mock_get_collection, embedder):
+        mock_collection = mock_get_collection.return_value
+        mock_collection.count.return_value = 3
+        mock_collection.query.return_value = {"documents": [[]], "metadatas": [[]]}
+
+        pdf_search.invoke({"query": "AI concepts", "n_results": 1})
+        pdf_search.invoke({"query": "AI concepts", "n_results": 2})
+
+        embedder.embed_query.assert_called_once_with(["AI concepts"])
+        assert mock_collection.query.call_args.kwargs["query_embeddings"] == [[0.1, 0.2]]
+
+    @pytest.mark.usefixtures("pypdf_only")
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_ingest_clears_search_cache(self, mock_pdf_reader_cls, mock_get_collection, pdf_dir):
+        mock_collection = mock_get_collection.return_value
+        mock_collection.count.return_value = 3
+        mock_collection.query.return_value = {"documents": [[]], "metadatas": [[]]}
+        mock_collection.get.return_value = {"ids": []}
+        page = MagicMock()
+        page.extract_text.return_value = _PAGE1_TEXT
+        mock_pdf_reader_cls.return_value.pages = [page]
+
+        pdf_search.invoke({"query": "AI concepts"})
+        ingest_pdf(str(pdf_dir / "test.pdf"))
+        pdf_search.invoke({"query": "AI concepts"})
+
+        assert mock_collection.query.call_count == 2
+
     @patch("tools.pdf_reader._get_chroma_collection")
     def test_pdf_search_handles_error(self, mock_get_collection):
         mock_get_collection.side_effect = Exception("ChromaDB unavailable")
 
-        from tools.pdf_reader import pdf_search
-
         result = pdf_search.invoke({"query": "test"})
         assert "Error" in result
 
 
+class TestChunkWords:
+    """Tests for the word-window chunker."""
+
+    @pytest.mark.parametrize("n_words", [0, 1, 80, 100, 101, 250])
+    def test_matches_per_window_join(self, n_words):
+        words = [f"w{i}" for i in range(n_words)]
+        expected = [" ".join(words[i : i + 100]) for i in range(0, n_words, 80)]
+        assert _chunk_words("  \n".join(words)) == expected
+
+
+class _BruteForceIndex:
+    """Exact inner-product stand-in for faiss.IndexHNSWFlat."""
+
+    def __init__(self, dim, m, metric):
+        self.hnsw = SimpleNamespace(efConstruction=0, efSearch=0)
+        self._vectors = np.zeros((0, dim), dtype="float32")
+
+    def add(self, vectors):
+        self._vectors = np.vstack([self._vectors, vectors])
+
+    def search(self, queries, k):
+        scores = queries @ self._vectors.T
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(scores, order, axis=1), order
+
+
+def _normalize_l2(vectors):
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def fake_faiss(monkeypatch):
+    """Enable the FAISS mirror backed by a brute-force index."""
+    faiss = SimpleNamespace(
+        IndexHNSWFlat=_BruteForceIndex,
+        METRIC_INNER_PRODUCT=0,
+        normalize_L2=_normalize_l2,
+    )
+    monkeypatch.setenv("PDF_SEARCH_FAISS", "1")
+    monkeypatch.setattr(pdf_reader_module, "_import_faiss", lambda: faiss)
+    monkeypatch.setattr(pdf_reader_module, "_faiss_mirror", None)
+    return faiss
+
+
+class TestFaissMirror:
+    """Tests for the optional in-memory FAISS search path."""
+
+    @pytest.fixture
+    def collection(self, embedder):
+        embedder.embed_query.return_value = [[0.0, 2.0]]
+        collection = MagicMock()
+        collection.count.return_value = 3
+        collection.get.return_value = {
+            "embeddings": [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]],
+            "documents": ["about x", "about y", "about both"],
+            "metadatas": [{"source": "a.pdf", "page": i} for i in (1, 2, 3)],
+        }
+        return collection
+
+    @pytest.mark.usefixtures("fake_faiss")
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_pdf_search_queries_mirror(self, mock_get_collection, collection, embedder):
+        mock_get_collection.return_value = collection
+
+        result = pdf_search.invoke({"query": "y", "n_results": 2})
+
+        assert result.index("about y") < result.index("about both")
+        assert "about x" not in result
+        collection.query.assert_not_called()
+        collection.count.assert_called_once()
+        embedder.embed_query.assert_called_once_with(["y"])
+
+    @pytest.mark.usefixtures("fake_faiss")
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_mirror_rebuilt_when_count_changes(self, mock_get_collection, collection):
+        mock_get_collection.return_value = collection
+
+        pdf_search.invoke({"query": "y"})
+        collection.count.return_value = 4
+        pdf_reader_module._count_cache.clear()  # let the count TTL lapse
+        pdf_search.invoke({"query": "x"})
+
+        assert collection.get.call_count == 2
+
+    @pytest.mark.usefixtures("fake_faiss")
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_source_filter_bypasses_mirror(self, mock_get_collection, collection):
+        collection.query.return_value = {"documents": [["about x"]], "metadatas": [[{"page": 1}]]}
+        mock_get_collection.return_value = collection
+
+        pdf_search.invoke({"query": "x", "source": "a.pdf"})
+
+        collection.query.assert_called_once()
+        collection.get.assert_not_called()
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_falls_back_to_chroma_without_faiss(self, mock_get_collection, collection, monkeypatch):
+        monkeypatch.setenv("PDF_SEARCH_FAISS", "1")
+        monkeypatch.setattr(pdf_reader_module, "_import_faiss", lambda: None)
+        collection.query.return_value = {"documents": [["about x"]], "metadatas": [[{"page": 1}]]}
+        mock_get_collection.return_value = collection
+
+        assert "about x" in pdf_search.invoke({"query": "x"})
+        collection.query.assert_called_once()
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    """A directory of placeholder PDF files; their content comes from mocked readers."""
+    for name in ("test.pdf", "empty.pdf", "a.pdf", "b.pdf", "big.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4\n")
+    return tmp_path
+
+
+def _write_text_pdf(path, lines):
+    """Write a real PDF with one page per line of text and return its path."""
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for line in lines:
+        page = writer.add_blank_page(200, 200)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 20 100 Td ({line}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+
+    writer.write(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def text_pdf(tmp_path):
+    """A real two-page PDF with one line of text per page."""
+    return _write_text_pdf(tmp_path / "real.pdf", ["Hello page one", "Second page here"])
+
+
+@pytest.fixture
+def no_pdftotext(monkeypatch):
+    """Hide the pdftotext binary from the extractor."""
+    monkeypatch.setattr(pdf_reader_module.shutil, "which", lambda name: None)
+
+
+@pytest.fixture
+def pypdf_only(monkeypatch, no_pdftotext):
+    """Force the pypdf extraction path even when faster extractors exist."""
+    monkeypatch.setattr(pdf_extraction_module, "import_fitz", lambda: None)
+
+
+@pytest.mark.usefixtures("pypdf_only")
 class TestPdfIngestion:
     """Tests for PDF ingestion into ChromaDB."""
 
     @patch("tools.pdf_reader._get_chroma_collection")
     @patch("pypdf.PdfReader")
-    def test_ingest_pdf_processes_pages(self, mock_pdf_reader_cls, mock_get_collection):
+    def test_ingest_pdf_processes_pages(self, mock_pdf_reader_cls, mock_get_collection, pdf_dir):
         # Mock PDF with 2 pages of text
         mock_page1 = MagicMock()
-        mock_page1.extract_text.return_value = "This is the first page with some content " * 20
+        mock_page1.extract_text.return_value = _PAGE1_TEXT
         mock_page2 = MagicMock()
-        mock_page2.extract_text.return_value = "Second page about machine learning " * 20
+        mock_page2.extract_text.return_value = _PAGE2_TEXT
         mock_reader = MagicMock()
         mock_reader.pages = [mock_page1, mock_page2]
         mock_pdf_reader_cls.return_value = mock_reader
@@ -150,20 +582,282 @@ class TestPdfIngestion:
         mock_collection = MagicMock()
         mock_get_collection.return_value = mock_collection
 
-        from tools.pdf_reader import ingest_pdf
-
-        chunks = ingest_pdf("/tmp/test.pdf")
+        chunks = ingest_pdf(str(pdf_dir / "test.pdf"))
         assert chunks > 0
         mock_collection.upsert.assert_called_once()
 
     @patch("tools.pdf_reader._get_chroma_collection")
     @patch("pypdf.PdfReader")
-    def test_ingest_pdf_empty_file(self, mock_pdf_reader_cls, mock_get_collection):
+    def test_ingest_pdf_empty_file(self, mock_pdf_reader_cls, mock_get_collection, pdf_dir):
         mock_reader = MagicMock()
         mock_reader.pages = []
         mock_pdf_reader_cls.return_value = mock_reader
 
-        from tools.pdf_reader import ingest_pdf
-
-        chunks = ingest_pdf("/tmp/empty.pdf")
+        chunks = ingest_pdf(str(pdf_dir / "empty.pdf"))
         assert chunks == 0
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_ingest_pdf_skips_already_ingested_chunks(
+        self, mock_pdf_reader_cls, mock_get_collection, pdf_dir
+    ):
+        page = MagicMock()
+        page.extract_text.return_value = _PAGE2_TEXT
+        mock_pdf_reader_cls.return_value.pages = [page]
+        mock_collection = mock_get_collection.return_value
+        mock_collection.get.return_value = {"ids": []}
+
+        first = ingest_pdf(str(pdf_dir / "test.pdf"))
+        stored_ids = mock_collection.upsert.call_args.kwargs["ids"]
+        mock_collection.upsert.reset_mock()
+        mock_collection.get.return_value = {"ids": stored_ids}
+
+        assert first == len(stored_ids) > 0
+        # The whole document is still reported, but nothing is re-embedded.
+        assert ingest_pdf(str(pdf_dir / "test.pdf")) == first
+        mock_collection.upsert.assert_not_called()
+        mock_collection.delete.assert_not_called()
+        mock_collection.get.assert_called_with(
+            where={"source": {"$in": ["test.pdf"]}}, include=[]
+        )
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_reingest_deletes_chunks_the_source_no_longer_has(
+        self, mock_pdf_reader_cls, mock_get_collection, pdf_dir
+    ):
+        page = MagicMock()
+        page.extract_text.return_value = _PAGE2_TEXT
+        mock_pdf_reader_cls.return_value.pages = [page]
+        mock_collection = mock_get_collection.return_value
+        mock_collection.get.return_value = {"ids": ["old-chunk"]}
+
+        assert ingest_pdf(str(pdf_dir / "test.pdf")) > 0
+
+        mock_collection.delete.assert_called_once_with(ids=["old-chunk"])
+        mock_collection.upsert.assert_called_once()
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_ingest_without_replace_keeps_stored_chunks(
+        self, mock_pdf_reader_cls, mock_get_collection, pdf_dir
+    ):
+        page = MagicMock()
+        page.extract_text.return_value = _PAGE2_TEXT
+        mock_pdf_reader_cls.return_value.pages = [page]
+        mock_collection = mock_get_collection.return_value
+        mock_collection.get.return_value = {"ids": ["other-document-chunk"]}
+
+        assert ingest_pdf(str(pdf_dir / "test.pdf"), replace=False) > 0
+
+        mock_collection.delete.assert_not_called()
+        mock_collection.upsert.assert_called_once()
+
+    def test_chunk_id_includes_source_and_page(self):
+        ids = {
+            pdf_reader_module._chunk_id("a.pdf", 1, "same text"),
+            pdf_reader_module._chunk_id("b.pdf", 1, "same text"),
+            pdf_reader_module._chunk_id("a.pdf", 2, "same text"),
+        }
+        assert len(ids) == 3
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_ingest_pdf_reads_real_file_through_mmap(self, mock_get_collection, text_pdf):
+        mock_get_collection.return_value.get.return_value = {"ids": []}
+
+        assert ingest_pdf(text_pdf, source="upload.pdf") == 2
+
+        kwargs = mock_get_collection.return_value.upsert.call_args.kwargs
+        assert kwargs["documents"] == ["Hello page one", "Second page here"]
+        assert [(m["source"], m["page"]) for m in kwargs["metadatas"]] == [
+            ("upload.pdf", 1), ("upload.pdf", 2),
+        ]
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_ingest_pdf_skips_graphics_only_pages(
+        self, mock_pdf_reader_cls, mock_get_collection, monkeypatch, pdf_dir
+    ):
+        monkeypatch.setattr(pdf_extraction_module, "_GRAPHICS_PAGE_BYTES", 1000)
+        drawing = MagicMock()
+        drawing.get_contents.return_value.get_data.return_value = b"0 0 m 1 1 l S\n" * 500
+        text_page = MagicMock()
+        text_page.get_contents.return_value.get_data.return_value = b"BT (x) Tj ET\n" * 500
+        text_page.extract_text.return_value = _PAGE1_TEXT
+        mock_pdf_reader_cls.return_value.pages = [drawing, text_page]
+
+        assert ingest_pdf(str(pdf_dir / "test.pdf")) > 0
+
+        drawing.extract_text.assert_not_called()
+        text_page.extract_text.assert_called_once_with(extraction_mode="plain")
+        metadatas = mock_get_collection.return_value.upsert.call_args.kwargs["metadatas"]
+        assert {m["page"] for m in metadatas} == {2}
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_ingest_pdfs_batches_upserts_across_files(
+        self, mock_pdf_reader_cls, mock_get_collection, monkeypatch, pdf_dir
+    ):
+        page1 = MagicMock()
+        page1.extract_text.return_value = _PAGE1_TEXT
+        page2 = MagicMock()
+        page2.extract_text.return_value = _PAGE2_TEXT
+        mock_pdf_reader_cls.side_effect = [
+            MagicMock(pages=[page1]), MagicMock(pages=[page1]),
+            MagicMock(pages=[page1, page2]), MagicMock(pages=[page1, page2]),
+        ]
+        mock_get_collection.return_value.get.return_value = {"ids": []}
+        monkeypatch.setattr(pdf_reader_module, "_UPSERT_BATCH_SIZE", 3)
+
+        total = ingest_pdfs([str(pdf_dir / "a.pdf"), str(pdf_dir / "b.pdf")])
+
+        calls = mock_get_collection.return_value.upsert.call_args_list
+        ids = [i for c in calls for i in c.kwargs["ids"]]
+        assert len(ids) == total == len(set(ids))
+        assert [len(c.kwargs["ids"]) for c in calls] == [3] * (total // 3) + ([total % 3] if total % 3 else [])
+        # b.pdf repeats a.pdf's first page, which is still stored per source.
+        assert {(m["source"], m["page"]) for c in calls for m in c.kwargs["metadatas"]} == {
+            ("a.pdf", 1), ("b.pdf", 1), ("b.pdf", 2),
+        }
+
+    def test_ingest_pdfs_rejects_mismatched_sources(self):
+        with pytest.raises(ValueError, match="sources"):
+            ingest_pdfs(["/tmp/a.pdf", "/tmp/b.pdf"], sources=["a.pdf"])
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    def test_ingest_pdf_large_file_uses_pool(
+        self, mock_pdf_reader_cls, mock_get_collection, monkeypatch, pdf_dir
+    ):
+        pages = []
+        for text in (_PAGE1_TEXT, _PAGE2_TEXT, "Third page on evaluation " * 20):
+            page = MagicMock()
+            page.extract_text.return_value = text
+            pages.append(page)
+        mock_pdf_reader_cls.return_value.pages = pages
+        # Threads stand in for processes: the mocked reader cannot be pickled.
+        pool_cls = MagicMock(side_effect=lambda **kwargs: ThreadPoolExecutor())
+        monkeypatch.setattr(pdf_reader_module, "ProcessPoolExecutor", pool_cls)
+        monkeypatch.setattr(pdf_reader_module, "_PARALLEL_MIN_SECONDS", 0.0)
+        monkeypatch.setattr(pdf_reader_module, "_PAGES_PER_TASK", 1)
+        monkeypatch.setattr(pdf_reader_module.os, "cpu_count", lambda: 16)
+
+        assert ingest_pdf(str(pdf_dir / "big.pdf")) > 0
+
+        pool_cls.assert_called_once()
+        assert pool_cls.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+        assert pool_cls.call_args.kwargs["max_workers"] == pdf_reader_module._MAX_EXTRACT_WORKERS
+        metadatas = mock_get_collection.return_value.upsert.call_args.kwargs["metadatas"]
+        assert [m["page"] for m in metadatas] == sorted(m["page"] for m in metadatas)
+        assert {m["page"] for m in metadatas} == {1, 2, 3}
+
+
+    def test_cheap_pages_are_not_sent_to_pool(self, monkeypatch, tmp_path):
+        path = _write_text_pdf(tmp_path / "long.pdf", [f"Page {i} text" for i in range(64)])
+        pool_cls = MagicMock(wraps=pdf_reader_module.ProcessPoolExecutor)
+        monkeypatch.setattr(pdf_reader_module, "ProcessPoolExecutor", pool_cls)
+        monkeypatch.setattr(pdf_reader_module.os, "cpu_count", lambda: 4)
+
+        started = time.perf_counter()
+        serial = pdf_extraction_module.extract_page_range((path, 0, 64))
+        serial_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        pages = list(pdf_reader_module._extract_pages(path))
+        auto_seconds = time.perf_counter() - started
+
+        assert pages == serial
+        pool_cls.assert_not_called()
+        # Spawning workers costs a fresh interpreter each; fast pages stay serial.
+        assert auto_seconds < serial_seconds * 2 + 0.25
+
+    def test_extraction_module_does_not_import_tools(self):
+        code = (
+            "import sys, services.pdf_extraction; "
+            "sys.exit(any(m.split('.')[0] in ('tools', 'langchain_core') for m in sys.modules))"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=_BACKEND_DIR)
+
+
+@pytest.mark.usefixtures("no_pdftotext")
+class TestPdfIngestionPyMuPDF:
+    """Tests for the PyMuPDF extraction path."""
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    def test_ingest_pdf_uses_fitz_and_closes_doc(self, mock_get_collection, monkeypatch):
+        page1 = MagicMock()
+        page1.get_text.return_value = [
+            (0, 0, 100, 20, _PAGE1_TEXT, 0, 0),
+            (0, 20, 100, 80, "<image: DeviceRGB>", 1, 1),
+        ]
+        page2 = MagicMock()
+        page2.get_text.return_value = [(0, 0, 100, 20, _PAGE2_TEXT, 0, 0)]
+        doc = MagicMock()
+        doc.__len__.return_value = 2
+        doc.load_page.side_effect = [page1, page2]
+        fake_fitz = MagicMock()
+        fake_fitz.open.return_value = doc
+        monkeypatch.setattr(pdf_extraction_module, "import_fitz", lambda: fake_fitz)
+
+        chunks = ingest_pdf("/tmp/test.pdf")
+
+        assert chunks > 0
+        fake_fitz.open.assert_called_with("/tmp/test.pdf")
+        page1.get_text.assert_called_once_with("blocks")
+        doc.close.assert_called()
+        kwargs = mock_get_collection.return_value.upsert.call_args.kwargs
+        assert {m["page"] for m in kwargs["metadatas"]} == {1, 2}
+        assert not any("<image" in doc for doc in kwargs["documents"])
+
+
+class TestPdfIngestionPdftotext:
+    """Tests for the pdftotext subprocess fast path."""
+
+    @pytest.fixture(autouse=True)
+    def _pdftotext_on_path(self, monkeypatch):
+        monkeypatch.setattr(pdf_reader_module.shutil, "which", lambda name: "/usr/bin/pdftotext")
+
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("tools.pdf_reader.subprocess.run")
+    def test_ingest_pdf_splits_pages_on_form_feed(self, mock_run, mock_get_collection):
+        mock_run.return_value = MagicMock(stdout=f"{_PAGE1_TEXT}\f\f{_PAGE2_TEXT}\f")
+
+        chunks = ingest_pdf("/tmp/test.pdf")
+
+        assert chunks > 0
+        assert mock_run.call_args.args[0] == ["pdftotext", "-layout", "/tmp/test.pdf", "-"]
+        assert mock_run.call_args.kwargs["timeout"] == pdf_reader_module._PDFTOTEXT_TIMEOUT
+        pages = {m["page"] for m in mock_get_collection.return_value.upsert.call_args.kwargs["metadatas"]}
+        assert pages == {1, 3}
+
+    def test_pdftotext_output_decoded_as_utf8_with_replacement(self, monkeypatch, tmp_path):
+        # A real child process, so the bytes go through subprocess decoding.
+        script = tmp_path / "pdftotext"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            "sys.stdout.buffer.write('Caf\\u00e9 '.encode() + b'na\\xefve\\f')\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+        pages = pdf_reader_module._pdftotext_pages("/tmp/test.pdf")
+
+        assert pages == ["Caf\u00e9 na\ufffdve", ""]
+
+    @pytest.mark.parametrize("error", [
+        subprocess.CalledProcessError(1, "pdftotext"),
+        subprocess.TimeoutExpired("pdftotext", 120),
+    ], ids=["failed", "timed-out"])
+    @patch("tools.pdf_reader._get_chroma_collection")
+    @patch("pypdf.PdfReader")
+    @patch("tools.pdf_reader.subprocess.run")
+    def test_ingest_pdf_falls_back_when_pdftotext_fails(
+        self, mock_run, mock_pdf_reader_cls, mock_get_collection, monkeypatch, pdf_dir, error
+    ):
+        mock_run.side_effect = error
+        monkeypatch.setattr(pdf_extraction_module, "import_fitz", lambda: None)
+        page = MagicMock()
+        page.extract_text.return_value = _PAGE1_TEXT
+        mock_pdf_reader_cls.return_value.pages = [page]
+
+        assert ingest_pdf(str(pdf_dir / "test.pdf")) > 0
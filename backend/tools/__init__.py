@@ -1,12 +1,13 @@
 """Agent tools for CouncilOS."""
 
 from .web_search import web_search, create_web_search_tool
-from .pdf_reader import pdf_search, ingest_pdf, create_pdf_search_tool
+from .pdf_reader import pdf_search, ingest_pdf, ingest_pdfs, create_pdf_search_tool
 
 __all__ = [
     "web_search",
     "create_web_search_tool",
     "pdf_search",
     "ingest_pdf",
+    "ingest_pdfs",
     "create_pdf_search_tool",
 ]
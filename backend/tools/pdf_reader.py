@@ -1,102 +1,536 @@
 """
-PDF Reader Tool — PyPDF + ChromaDB vector store wrapper for agent nodes.
+PDF Reader Tool — PyMuPDF/PyPDF + ChromaDB vector store wrapper for agent nodes.
 
 Loads PDF files, splits them into chunks, stores embeddings in a local
 ChromaDB collection, and performs similarity search against queries.
+Text is extracted with Poppler's pdftotext when it is on PATH, then PyMuPDF
+when it is installed, and with pypdf otherwise.
 Requires the CHROMA_PERSIST_DIR environment variable for storage location.
 """
 
+import hashlib
+import logging
+import multiprocessing
 import os
-from typing import List, Optional
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Optional
 
 from langchain_core.tools import tool
 
-# Module-level collection cache to avoid re-initializing on every call
+from services.pdf_extraction import extract_page_range, page_count
+
+logger = logging.getLogger(__name__)
+
+# Module-level collection cache to avoid re-initializing on every call.
+# Misses are serialized by the lock (lru_cache would not stop two threads
+# from both opening a PersistentClient on concurrent first calls).
 _collection_cache: dict = {}
+_collection_lock = threading.Lock()
+
+# Embedding functions by (model, device), shared by the collections and
+# _embed_query so each model is loaded once per process.
+_embedding_function_cache: dict = {}
+_embedding_function_lock = threading.Lock()
+
+# Seconds before a pdftotext run is abandoned for the in-process extractors.
+_PDFTOTEXT_TIMEOUT = 120
+
+# In-process extraction times the first _PAGES_PER_TASK pages and fans the
+# rest out to a process pool only when they would take longer than
+# _PARALLEL_MIN_SECONDS serially; each spawned worker costs a fresh
+# interpreter plus the PDF library import (a few hundred ms).
+_PAGES_PER_TASK = 8
+_PARALLEL_MIN_SECONDS = 4.0
+_MAX_EXTRACT_WORKERS = 4
+
+# Upper bound on documents per ChromaDB upsert call.
+_UPSERT_BATCH_SIZE = 5000
+
+# In-memory FAISS copy of the default collection (see _faiss_search).
+_faiss_mirror: Optional[dict] = None
+
+# Chunk count per collection name as (timestamp, count), reused for
+# _COUNT_TTL seconds.
+_count_cache: dict = {}
+_COUNT_TTL = 1.0
+
+
+def _hnsw_metadata() -> dict:
+    """
+    Collection metadata with HNSW index parameters.
+
+    Larger M / construction_ef are a one-off build cost; search_ef trades a
+    little query latency for recall. Override with CHROMA_HNSW_M,
+    CHROMA_HNSW_CONSTRUCTION_EF, CHROMA_HNSW_SEARCH_EF and
+    CHROMA_HNSW_NUM_THREADS; unset or empty values use the defaults. Build
+    parameters only apply when a collection is first created.
+    """
+    return {
+        "hnsw:space": "cosine",
+        "hnsw:M": int(os.environ.get("CHROMA_HNSW_M") or 32),
+        "hnsw:construction_ef": int(os.environ.get("CHROMA_HNSW_CONSTRUCTION_EF") or 200),
+        "hnsw:search_ef": int(os.environ.get("CHROMA_HNSW_SEARCH_EF") or 64),
+        "hnsw:num_threads": int(os.environ.get("CHROMA_HNSW_NUM_THREADS") or os.cpu_count() or 1),
+    }
+
+
+def _embedding_function():
+    """
+    Return the shared embedding function for the PDF collections.
+
+    A SentenceTransformer model when CHROMA_EMBEDDING_MODEL is set (e.g.
+    ``all-MiniLM-L6-v2``), otherwise Chroma's DefaultEmbeddingFunction. The
+    instance is cached, so the collection and query embedding share one
+    loaded model.
+    """
+    model_name = os.environ.get("CHROMA_EMBEDDING_MODEL") or None
+    device = os.environ.get("CHROMA_EMBEDDING_DEVICE", "cpu")
+    key = (model_name, device)
+    with _embedding_function_lock:
+        if key not in _embedding_function_cache:
+            _embedding_function_cache[key] = _load_embedding_function(model_name, device)
+    return _embedding_function_cache[key]
+
+
+def _load_embedding_function(model_name: Optional[str], device: str):
+    """
+    Construct the embedding function for ``model_name``, or Chroma's default.
+
+    A SentenceTransformer model encodes each upsert or query as one batch and
+    returns normalized vectors, which suits the collection's cosine space;
+    it requires the sentence-transformers package. Chroma persists the
+    embedding function with the collection, so changing it needs a fresh
+    CHROMA_PERSIST_DIR.
+    """
+    if not model_name:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+        return DefaultEmbeddingFunction()
+
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+    return SentenceTransformerEmbeddingFunction(
+        model_name=model_name,
+        device=device,
+        normalize_embeddings=True,
+    )
 
 
 def _get_chroma_collection(collection_name: str = "council_pdfs"):
     """Get or create a ChromaDB collection for PDF content."""
-    if collection_name in _collection_cache:
-        return _collection_cache[collection_name]
+    collection = _collection_cache.get(collection_name)
+    if collection is not None:
+        return collection
+
+    with _collection_lock:
+        if collection_name not in _collection_cache:
+            _collection_cache[collection_name] = _open_collection(collection_name)
+    return _collection_cache[collection_name]
 
+
+def _open_collection(collection_name: str):
+    """Open the persistent client and get or create the named collection."""
     import chromadb
 
     persist_dir = os.environ.get("CHROMA_PERSIST_DIR", "./chroma_db")
     client = chromadb.PersistentClient(path=persist_dir)
     collection = client.get_or_create_collection(
         name=collection_name,
-        metadata={"hnsw:space": "cosine"},
+        metadata=_hnsw_metadata(),
+        embedding_function=_embedding_function(),
     )
-    _collection_cache[collection_name] = collection
     return collection
 
 
-def ingest_pdf(file_path: str, collection_name: str = "council_pdfs") -> int:
+def _pdftotext_pages(file_path: str) -> Optional[List[str]]:
+    """
+    Extract per-page text with Poppler's ``pdftotext`` binary.
+
+    Returns None when the binary is missing, fails or times out, so the
+    caller can fall back to an in-process parser.
+    """
+    if not shutil.which("pdftotext"):
+        return None
+    try:
+        result = subprocess.run(
+            ["pdftotext", "-layout", file_path, "-"],
+            capture_output=True,
+            # pdftotext writes UTF-8 regardless of the server's locale.
+            encoding="utf-8",
+            errors="replace",
+            check=True,
+            timeout=_PDFTOTEXT_TIMEOUT,
+        )
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+    # pdftotext terminates every page with a form feed.
+    return result.stdout.split("\f")
+
+
+def _extract_pages(file_path: str) -> Iterator[tuple]:
+    """
+    Yield ``(page_num, text)`` for every page of a PDF, in page order.
+
+    ``pdftotext`` runs out of process and keeps the PDF object graph off the
+    Python heap; PyMuPDF's C extractor is next, and pypdf is the pure-Python
+    fallback. In-process extraction is CPU-bound, so when the first pages
+    show that the rest would take several seconds, the remaining page ranges
+    are split across a small process pool.
+    """
+    pages = _pdftotext_pages(file_path)
+    if pages is not None:
+        yield from enumerate(pages)
+        return
+
+    total = page_count(file_path)
+    head = min(_PAGES_PER_TASK, total)
+    started = time.perf_counter()
+    first_pages = extract_page_range((file_path, 0, head))
+    per_page = (time.perf_counter() - started) / max(head, 1)
+    yield from first_pages
+
+    workers = min(_MAX_EXTRACT_WORKERS, os.cpu_count() or 1)
+    if workers < 2 or per_page * (total - head) < _PARALLEL_MIN_SECONDS:
+        if head < total:
+            yield from extract_page_range((file_path, head, total))
+        return
+
+    ranges = [
+        (file_path, start, min(start + _PAGES_PER_TASK, total))
+        for start in range(head, total, _PAGES_PER_TASK)
+    ]
+    # Spawned, not forked: the server process runs other threads (tool pools,
+    # warm-up, Chroma), and a forked child can inherit a lock held mid-fork.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        for batch in pool.map(extract_page_range, ranges):
+            yield from batch
+
+
+def _chunk_words(text: str, chunk_size: int = 100, overlap: int = 20) -> List[str]:
+    """
+    Split text into overlapping windows of ``chunk_size`` words (~500 chars).
+
+    Each window is a C-level join over a list slice. That measured faster
+    than precomputing per-word character offsets or numpy sliding windows,
+    both of which add a pass over every word.
+    """
+    words = text.split()
+    step = chunk_size - overlap
+    return [" ".join(words[i : i + chunk_size]) for i in range(0, len(words), step)]
+
+
+def _chunk_id(source: str, page: int, chunk_text: str) -> str:
+    """
+    Chunk ID derived from source, page and text.
+
+    Re-ingesting an unchanged chunk yields the same ID, while identical text
+    on another page or in another file still gets its own entry.
+    """
+    key = f"{source}\0{page}\0{chunk_text}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _collect_chunks(file_path: str, source: Optional[str] = None) -> tuple:
+    """Extract and chunk one PDF into parallel document/metadata/ID lists."""
+    source = source or os.path.basename(file_path)
+    chunks: List[str] = []
+    metadata_list: List[dict] = []
+
+    for page_num, text in _extract_pages(file_path):
+        if not text or not text.strip():
+            continue
+
+        for chunk_text in _chunk_words(text):
+            chunks.append(chunk_text)
+            metadata_list.append({
+                "source": source,
+                "page": page_num + 1,
+            })
+
+    ids = [
+        _chunk_id(metadata["source"], metadata["page"], chunk)
+        for chunk, metadata in zip(chunks, metadata_list)
+    ]
+    return chunks, metadata_list, ids
+
+
+def _upsert_batched(
+    collection,
+    documents: List[str],
+    metadatas: List[dict],
+    ids: List[str],
+) -> None:
+    """Upsert in windows of _UPSERT_BATCH_SIZE to stay under ChromaDB's batch limit."""
+    for start in range(0, len(ids), _UPSERT_BATCH_SIZE):
+        stop = start + _UPSERT_BATCH_SIZE
+        collection.upsert(
+            documents=documents[start:stop],
+            metadatas=metadatas[start:stop],
+            ids=ids[start:stop],
+        )
+
+
+def ingest_pdf(
+    file_path: str,
+    collection_name: str = "council_pdfs",
+    source: Optional[str] = None,
+    replace: bool = True,
+) -> int:
     """
     Read a PDF file, split into chunks, and store in ChromaDB.
 
     Args:
         file_path: Path to the PDF file.
         collection_name: ChromaDB collection name.
+        source: Name recorded as the chunks' source (default: file basename).
+        replace: Delete chunks stored under the same source that this file
+            no longer produces (see ingest_pdfs).
 
     Returns:
-        Number of chunks ingested.
+        Number of chunks in the document.
     """
-    from pypdf import PdfReader
+    return ingest_pdfs([file_path], collection_name, sources=[source], replace=replace)
 
-    reader = PdfReader(file_path)
-    chunks: List[str] = []
-    metadata_list: List[dict] = []
 
-    for page_num, page in enumerate(reader.pages):
-        text = page.extract_text()
-        if not text or not text.strip():
-            continue
+def ingest_pdfs(
+    file_paths: List[str],
+    collection_name: str = "council_pdfs",
+    sources: Optional[List[Optional[str]]] = None,
+    replace: bool = True,
+) -> int:
+    """
+    Read several PDF files and store all of their chunks in ChromaDB.
 
-        # Split long pages into ~500 character chunks with overlap
-        words = text.split()
-        chunk_size = 100  # words per chunk
-        overlap = 20
-
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk_words = words[i : i + chunk_size]
-            chunk_text = " ".join(chunk_words)
-            if chunk_text.strip():
-                chunks.append(chunk_text)
-                metadata_list.append({
-                    "source": os.path.basename(file_path),
-                    "page": page_num + 1,
-                })
-
-    if not chunks:
+    Chunks from every file are accumulated and written in as few upserts as
+    possible, amortizing the per-call index and transaction cost. Chunk IDs
+    hash source, page and text, so chunks already in the collection are
+    skipped before any embeddings are computed. With ``replace``, stored
+    chunks of a re-ingested source that it no longer produces are deleted.
+
+    Args:
+        file_paths: Paths to the PDF files.
+        collection_name: ChromaDB collection name.
+        sources: Per-file source names, parallel to file_paths (default:
+            each file's basename).
+        replace: Treat each file as the new version of its source; when
+            False, chunks are only added and nothing stored is deleted.
+
+    Returns:
+        Number of chunks the files consist of, including chunks that were
+        already stored and therefore not re-embedded.
+
+    Raises:
+        ValueError: If sources is given with a different length than file_paths.
+    """
+    if sources is not None and len(sources) != len(file_paths):
+        raise ValueError(
+            f"sources has {len(sources)} entries for {len(file_paths)} file paths."
+        )
+
+    all_chunks: List[str] = []
+    all_metadatas: List[dict] = []
+    all_ids: List[str] = []
+    seen: set = set()
+    ingested_sources: set = set()
+
+    sources = sources or [None] * len(file_paths)
+    for file_path, source in zip(file_paths, sources, strict=True):
+        source = source or os.path.basename(file_path)
+        ingested_sources.add(source)
+        for chunk, metadata, chunk_id in zip(*_collect_chunks(file_path, source)):
+            # ChromaDB rejects duplicate IDs within one upsert.
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            all_chunks.append(chunk)
+            all_metadatas.append(metadata)
+            all_ids.append(chunk_id)
+
+    if not ingested_sources:
         return 0
 
     collection = _get_chroma_collection(collection_name)
 
-    # Generate deterministic IDs based on file and chunk position
-    ids = [
-        f"{os.path.basename(file_path)}_chunk_{i}"
-        for i in range(len(chunks))
+    stored = set(collection.get(
+        where={"source": {"$in": sorted(ingested_sources)}}, include=[]
+    )["ids"])
+    stale = stored.difference(all_ids) if replace else set()
+    if stale:
+        collection.delete(ids=sorted(stale))
+
+    new = [
+        (chunk, metadata, chunk_id)
+        for chunk, metadata, chunk_id in zip(all_chunks, all_metadatas, all_ids)
+        if chunk_id not in stored
     ]
+    if new:
+        _upsert_batched(collection, *(list(col) for col in zip(*new)))
+    if new or stale:
+        _invalidate_search_caches()
+    return len(all_ids)
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+def _invalidate_search_caches() -> None:
+    """Drop cached results and the FAISS mirror after the collection changes."""
+    global _faiss_mirror
+    _faiss_mirror = None
+    _count_cache.clear()
+    _search_passages.cache_clear()
+
+
+def _collection_count(collection) -> int:
+    """collection.count(), cached briefly per collection name."""
+    now = time.monotonic()
+    cached = _count_cache.get(collection.name)
+    if cached is not None and now - cached[0] < _COUNT_TTL:
+        return cached[1]
+    count = collection.count()
+    _count_cache[collection.name] = (now, count)
+    return count
+
+
+def _import_faiss():
+    """Return the faiss module, or None when it is not installed."""
+    try:
+        import faiss
+    except ImportError:
+        return None
+    return faiss
 
-    collection.upsert(
-        documents=chunks,
-        metadatas=metadata_list,
-        ids=ids,
-    )
 
-    return len(chunks)
+def _faiss_enabled() -> bool:
+    return os.environ.get("PDF_SEARCH_FAISS", "").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=1024)
+def _embed_query(query: str) -> tuple:
+    """
+    Embed a query with the embedding function the collections use.
+
+    Cached so retried or reformulated-back queries skip the model forward
+    pass; embeddings do not depend on the stored chunks, so ingestion
+    leaves this cache alone.
+    """
+    embedding_function = _embedding_function()
+    # embed_query exists from chromadb 1.0; older releases only have __call__.
+    embed = getattr(embedding_function, "embed_query", embedding_function)
+    return tuple(float(x) for x in embed([query])[0])
+
+
+def _build_faiss_mirror(faiss, collection, count: int) -> dict:
+    """Copy every stored chunk and embedding into a FAISS HNSW index."""
+    import numpy as np
+
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    embeddings = np.asarray(data["embeddings"], dtype="float32")
+    # Inner product over unit vectors ranks like the collection's cosine space.
+    faiss.normalize_L2(embeddings)
+
+    dim = embeddings.shape[1]
+    index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = 200
+    index.hnsw.efSearch = 64
+    index.add(embeddings)
+    return {
+        "index": index,
+        "count": count,
+        "documents": list(data["documents"]),
+        "metadatas": list(data["metadatas"]),
+    }
+
+
+def _faiss_search(collection, query: str, n_results: int, count: int):
+    """
+    Query an in-memory FAISS mirror of the collection, or return None.
+
+    Opt in with PDF_SEARCH_FAISS=1 (requires faiss-cpu). The mirror is built
+    from Chroma on first use and rebuilt after ingestion or whenever the
+    collection's count changes, so Chroma stays the source of truth. ``count``
+    is the caller's TTL-cached collection count, so a mirror hit makes no
+    Chroma round-trip.
+    """
+    global _faiss_mirror
+    if not _faiss_enabled():
+        return None
+    faiss = _import_faiss()
+    if faiss is None:
+        return None
+
+    import numpy as np
+
+    if _faiss_mirror is None or _faiss_mirror["count"] != count:
+        _faiss_mirror = _build_faiss_mirror(faiss, collection, count)
+
+    query_vec = np.asarray([_embed_query(query)], dtype="float32")
+    faiss.normalize_L2(query_vec)
+    _, indices = _faiss_mirror["index"].search(query_vec, n_results)
+
+    hits = [i for i in indices[0] if i >= 0]
+    documents = tuple(_faiss_mirror["documents"][i] for i in hits)
+    metadatas = tuple(_faiss_mirror["metadatas"][i] for i in hits)
+    return documents, metadatas
+
+
+def _format_passages(query: str, documents, metadatas) -> str:
+    """Render search hits as numbered passages with their source and page."""
+    if not documents:
+        return f"No relevant passages found for: {query}"
+
+    return "\n\n".join([
+        f"{i}. [Source: {meta.get('source', 'unknown')}, Page {meta.get('page', '?')}]\n   {doc}"
+        for i, (doc, meta) in enumerate(zip(documents, metadatas), 1)
+    ])
+
+
+@lru_cache(maxsize=512)
+def _search_passages(
+    query: str, n_results: int, source: Optional[str] = None, count: int = 0
+) -> str:
+    """
+    Run a similarity query and return the formatted passages.
+
+    Cached per ``(query, n_results, source, count)`` as finished text, so a
+    repeated query skips both the lookup and the formatting. Ingestion in this
+    process clears the cache; keying on the collection count also retires
+    entries once another process has written to the collection. Errors
+    propagate and are therefore never cached.
+    """
+    collection = _get_chroma_collection()
+    # The FAISS mirror has no metadata filter; filtered searches go to Chroma.
+    hits = None if source else _faiss_search(collection, query, n_results, count)
+    if hits is None:
+        query_args = {
+            "query_embeddings": [list(_embed_query(query))],
+            "n_results": n_results,
+        }
+        if source:
+            # Pre-filter on metadata so only that PDF's chunks are searched.
+            query_args["where"] = {"source": source}
+        results = collection.query(**query_args)
+        hits = (results.get("documents", [[]])[0], results.get("metadatas", [[]])[0])
+    return _format_passages(query, *hits)
 
 
 @tool
-def pdf_search(query: str, n_results: int = 5) -> str:
+def pdf_search(query: str, n_results: int = 5, source: Optional[str] = None) -> str:
     """
     Search the PDF knowledge base for information relevant to a query.
 
     Args:
         query: The search query to find relevant PDF content.
         n_results: Number of results to return (default 5).
+        source: Optional PDF file name to restrict the search to.
 
     Returns:
         A formatted string with relevant passages from ingested PDFs.
@@ -106,30 +540,38 @@ def pdf_search(query: str, n_results: int = 5) -> str:
     except Exception as exc:  # noqa: BLE001
         return f"[PDF Search Error] Could not access vector store: {exc}"
 
-    if collection.count() == 0:
+    count = _collection_count(collection)
+    if count == 0:
         return "[PDF Search] No documents have been ingested yet."
 
     try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=min(n_results, collection.count()),
-        )
+        return _search_passages(query, min(n_results, count), source, count)
     except Exception as exc:  # noqa: BLE001
         return f"[PDF Search Error] {exc}"
 
-    documents = results.get("documents", [[]])[0]
-    metadatas = results.get("metadatas", [[]])[0]
-
-    if not documents:
-        return f"No relevant passages found for: {query}"
 
-    formatted = []
-    for i, (doc, meta) in enumerate(zip(documents, metadatas), 1):
-        source = meta.get("source", "unknown")
-        page = meta.get("page", "?")
-        formatted.append(f"{i}. [Source: {source}, Page {page}]\n   {doc}")
+def start_warm_preload() -> Optional[threading.Thread]:
+    """
+    Open the collection and load its embedding model in the background.
 
-    return "\n\n".join(formatted)
+    Enabled by CHROMA_WARM_PRELOAD; called at app startup so the first
+    pdf_search does not pay the client bootstrap and model cold start. A
+    failure here is logged and does not stop startup; the first real search
+    reports it to the caller.
+    """
+    if os.environ.get("CHROMA_WARM_PRELOAD", "").lower() not in ("1", "true", "yes"):
+        return None
+
+    def warm() -> None:
+        try:
+            _get_chroma_collection()
+            _embed_query("warm-up")
+        except Exception:
+            logger.warning("PDF search warm-up failed", exc_info=True)
+
+    thread = threading.Thread(target=warm, name="chroma-warm-preload", daemon=True)
+    thread.start()
+    return thread
 
 
 def create_pdf_search_tool() -> Optional[tool]:
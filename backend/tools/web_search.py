@@ -6,13 +6,67 @@ for current information. Requires the TAVILY_API_KEY environment variable.
 """
 
 import os
-from typing import Optional
+import threading
+from typing import Any, Callable, Optional
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool, tool
 
+# Optional overrides for building the Tavily clients (take the API key).
+# None means the real TavilyClient / AsyncTavilyClient, imported on first use.
+_client_factory: Optional[Callable[[str], Any]] = None
+_async_client_factory: Optional[Callable[[str], Any]] = None
 
-@tool
-def web_search(query: str, max_results: int = 5) -> str:
+# Sync clients keyed by API key, so calls reuse one HTTP keep-alive pool.
+_client_cache: dict = {}
+_client_lock = threading.Lock()
+
+
+def _make_client(api_key: str) -> Any:
+    """Return the shared Tavily client for api_key, building it on first use."""
+    client = _client_cache.get(api_key)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _client_cache.get(api_key)
+        if client is None:
+            if _client_factory is not None:
+                client = _client_factory(api_key)
+            else:
+                from tavily import TavilyClient
+
+                client = TavilyClient(api_key=api_key)
+            _client_cache[api_key] = client
+    return client
+
+
+def _make_async_client(api_key: str) -> Any:
+    """Build an async Tavily client via the configured factory."""
+    if _async_client_factory is not None:
+        return _async_client_factory(api_key)
+
+    from tavily import AsyncTavilyClient
+
+    return AsyncTavilyClient(api_key=api_key)
+
+
+def _format_results(query: str, response: dict) -> str:
+    """Render a Tavily search response as numbered results."""
+    results = response.get("results", [])
+    if not results:
+        return f"No results found for: {query}"
+
+    formatted = []
+    for i, r in enumerate(results, 1):
+        title = r.get("title", "No title")
+        url = r.get("url", "")
+        content = r.get("content", "No content available")
+        formatted.append(f"{i}. **{title}**\n   URL: {url}\n   {content}")
+
+    return "\n\n".join(formatted)
+
+
+def _search(query: str, max_results: int = 5) -> str:
     """
     Search the web for current information on a topic.
 
@@ -23,13 +77,11 @@ def web_search(query: str, max_results: int = 5) -> str:
     Returns:
         A formatted string with search results including titles, URLs, and snippets.
     """
-    from tavily import TavilyClient
-
     api_key = os.environ.get("TAVILY_API_KEY")
     if not api_key:
         return "[Web Search Error] TAVILY_API_KEY environment variable is not set."
 
-    client = TavilyClient(api_key=api_key)
+    client = _make_client(api_key)
 
     try:
         response = client.search(
@@ -40,18 +92,35 @@ def web_search(query: str, max_results: int = 5) -> str:
     except Exception as exc:  # noqa: BLE001
         return f"[Web Search Error] {exc}"
 
-    results = response.get("results", [])
-    if not results:
-        return f"No results found for: {query}"
+    return _format_results(query, response)
 
-    formatted = []
-    for i, r in enumerate(results, 1):
-        title = r.get("title", "No title")
-        url = r.get("url", "")
-        content = r.get("content", "No content available")
-        formatted.append(f"{i}. **{title}**\n   URL: {url}\n   {content}")
 
-    return "\n\n".join(formatted)
+async def _asearch(query: str, max_results: int = 5) -> str:
+    """Async twin of _search; awaits the HTTP call instead of blocking a thread."""
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        return "[Web Search Error] TAVILY_API_KEY environment variable is not set."
+
+    try:
+        async with _make_async_client(api_key) as client:
+            response = await client.search(
+                query=query,
+                max_results=max_results,
+                search_depth="basic",
+            )
+    except Exception as exc:  # noqa: BLE001
+        return f"[Web Search Error] {exc}"
+
+    return _format_results(query, response)
+
+
+# Sync callers (the graph nodes) use invoke(); async callers can await
+# ainvoke() and fan several searches out concurrently.
+web_search = StructuredTool.from_function(
+    func=_search,
+    coroutine=_asearch,
+    name="web_search",
+)
 
 
 def create_web_search_tool() -> Optional[tool]: